@@ -0,0 +1,709 @@
+# -*- coding: utf-8 -*-
+"""
+Auditorías reanudables de listas de contraseñas.
+Valida con ValidadorContrasena archivos muy grandes (una contraseña por línea)
+leyéndolos mediante mmap en bloques grandes, guarda puntos de control periódicos
+y permite reanudar exactamente donde se quedó o repartir el archivo en
+fragmentos por rango de bytes que se procesan por separado y se fusionan después.
+
+Uso:
+    python auditoria.py volcado.txt --checkpoint auditoria.json
+    python auditoria.py volcado.txt --checkpoint auditoria.json --fragmentos 8 --procesos 8
+    python auditoria.py volcado.txt --checkpoint frag3.json --fragmentos 8 --fragmento 3
+    python auditoria.py --fusionar frag0.json frag1.json ...
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from estadisticas import AgregadorEstadisticas
+from hibp_api import HIBPChecker
+from hibp_rangos import RangoCompacto
+from politicas import cargar_politica
+from validator import ValidadorContrasena
+
+VERSION_CHECKPOINT = 4
+
+# Bytes del principio y del final del archivo que se usan para su huella
+BYTES_HUELLA_ARCHIVO = 1 << 20
+
+FIRMA_CACHE_HIBP = b'VCHIBP1\x00'
+_ENTRADA_CACHE_HIBP = struct.Struct('>5sI')
+
+
+class AuditoriaInterrumpida(Exception):
+    """
+    Se lanza cuando la auditoría se detiene (por ejemplo, por una caída de HIBP)
+    tras guardar un punto de control desde el que se puede reanudar.
+    """
+
+
+def dividir_en_fragmentos(ruta, fragmentos):
+    """
+    Divide un archivo en rangos de bytes de tamaño similar.
+
+    Los límites no tienen que coincidir con fines de línea: cada fragmento procesa
+    las líneas que empiezan dentro de su rango, así que ninguna línea se pierde
+    ni se procesa dos veces.
+
+    Args:
+        ruta (str): Archivo de entrada
+        fragmentos (int): Número de fragmentos
+
+    Returns:
+        list[tuple[int, int]]: Rangos (inicio, fin) con fin exclusivo
+
+    Raises:
+        ValueError: Si el número de fragmentos no es positivo
+    """
+    if fragmentos < 1:
+        raise ValueError(f'El número de fragmentos debe ser al menos 1: {fragmentos}')
+    tamano = os.path.getsize(ruta)
+    limites = [tamano * i // fragmentos for i in range(fragmentos + 1)]
+    return list(zip(limites[:-1], limites[1:]))
+
+
+def huella_archivo(ruta):
+    """
+    Calcula una huella del contenido de un archivo que no depende de su ruta.
+
+    Combina el tamaño con un BLAKE2b del primer y del último MB, de modo que se
+    puede comprobar que dos máquinas auditan el mismo volcado sin leerlo entero.
+
+    Args:
+        ruta (str): Archivo de entrada
+
+    Returns:
+        str: Huella en hexadecimal
+    """
+    tamano = os.path.getsize(ruta)
+    resumen = hashlib.blake2b(str(tamano).encode('ascii'), digest_size=16)
+    with open(ruta, 'rb') as archivo:
+        resumen.update(archivo.read(BYTES_HUELLA_ARCHIVO))
+        if tamano > BYTES_HUELLA_ARCHIVO:
+            archivo.seek(max(BYTES_HUELLA_ARCHIVO, tamano - BYTES_HUELLA_ARCHIVO))
+            resumen.update(archivo.read())
+    return resumen.hexdigest()
+
+
+def _inicio_de_linea(mapa, posicion):
+    """
+    Devuelve el inicio de la primera línea que empieza en posicion o después.
+    """
+    if posicion == 0 or mapa[posicion - 1] == ord('\n'):
+        return posicion
+    salto = mapa.find(b'\n', posicion)
+    return len(mapa) if salto < 0 else salto + 1
+
+
+def anadir_cache_hibp(ruta, rangos):
+    """
+    Añade rangos HIBP al final de un registro de caché, creándolo si no existe.
+
+    El registro solo crece: cada punto de control añade los prefijos descargados
+    desde el anterior, en lugar de reescribir la caché entera.
+
+    Args:
+        ruta (str): Archivo del registro
+        rangos (dict): Rangos empaquetados (RangoCompacto) por prefijo
+    """
+    with open(ruta, 'ab') as destino:
+        if destino.tell() == 0:
+            destino.write(FIRMA_CACHE_HIBP)
+        for prefijo, rango in rangos.items():
+            datos = rango.serializar()
+            destino.write(_ENTRADA_CACHE_HIBP.pack(prefijo.encode('ascii'), len(datos)))
+            destino.write(datos)
+        destino.flush()
+        os.fsync(destino.fileno())
+
+
+def cargar_cache_hibp(ruta):
+    """
+    Carga un registro de caché HIBP escrito con anadir_cache_hibp.
+
+    Una entrada incompleta al final (por una caída a mitad de escritura) se ignora.
+
+    Args:
+        ruta (str): Archivo del registro
+
+    Returns:
+        tuple: (rangos empaquetados por prefijo, bytes válidos del registro)
+
+    Raises:
+        IOError: Si el archivo no tiene el formato esperado
+    """
+    with open(ruta, 'rb') as origen:
+        datos = origen.read()
+    if len(datos) < len(FIRMA_CACHE_HIBP) and FIRMA_CACHE_HIBP.startswith(datos):
+        return {}, 0
+    if not datos.startswith(FIRMA_CACHE_HIBP):
+        raise IOError(f'Formato de caché HIBP no reconocido: {ruta}')
+
+    vista = memoryview(datos)
+    rangos = {}
+    posicion = len(FIRMA_CACHE_HIBP)
+    while posicion + _ENTRADA_CACHE_HIBP.size <= len(datos):
+        prefijo, longitud = _ENTRADA_CACHE_HIBP.unpack_from(datos, posicion)
+        fin = posicion + _ENTRADA_CACHE_HIBP.size + longitud
+        if fin > len(datos):
+            break
+        rangos[prefijo.decode('ascii')] = RangoCompacto.deserializar(
+            vista[posicion + _ENTRADA_CACHE_HIBP.size:fin]
+        )
+        posicion = fin
+    return rangos, posicion
+
+
+def _escribir_atomico(ruta, escribir):
+    """
+    Escribe un archivo de forma atómica y duradera.
+
+    El contenido se escribe en un archivo temporal que se vuelca a disco (fsync)
+    antes de sustituir al original con os.replace; después se vuelca también el
+    directorio para que el cambio de nombre sobreviva a un corte de luz.
+
+    Args:
+        ruta (str): Archivo de destino
+        escribir (callable): Recibe el archivo temporal abierto en modo texto
+    """
+    temporal = f'{ruta}.tmp'
+    with open(temporal, 'w', encoding='utf-8') as destino:
+        escribir(destino)
+        destino.flush()
+        os.fsync(destino.fileno())
+    os.replace(temporal, ruta)
+
+    # En sistemas sin soporte para abrir directorios (Windows) basta con os.replace
+    try:
+        directorio = os.open(os.path.dirname(os.path.abspath(ruta)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(directorio)
+    except OSError:
+        pass
+    finally:
+        os.close(directorio)
+
+
+class Auditoria:
+    """
+    Auditoría reanudable de un archivo (o de un fragmento de él).
+
+    Los puntos de control guardan el offset en bytes de la siguiente línea por
+    procesar y los agregados parciales. Si el cliente HIBP tiene caché, los rangos
+    descargados se añaden a un registro junto al punto de control (cada prefijo
+    una sola vez, hasta tamano_cache prefijos). Al reanudar, la auditoría continúa
+    desde ese offset con los mismos agregados y la caché restaurada.
+    """
+
+    def __init__(self, validador, ruta, ruta_checkpoint=None, inicio=0, fin=None,
+                 cada_lineas=10000, cada_segundos=60, tamano_bloque=8 << 20,
+                 reintentos=3, espera_reintento=5, exigir_hibp=True,
+                 clase_resumen=AgregadorEstadisticas, silencioso=True):
+        """
+        Prepara la auditoría y, si existe el punto de control, lo carga.
+
+        Args:
+            validador (ValidadorContrasena): Validador a usar
+            ruta (str): Archivo de entrada, una contraseña por línea
+            ruta_checkpoint (str | None): Archivo JSON del punto de control
+                (None para no guardar puntos de control)
+            inicio (int): Offset de inicio del fragmento en bytes
+            fin (int | None): Offset de fin (exclusivo) del fragmento; None hasta el final
+            cada_lineas (int): Líneas entre puntos de control
+            cada_segundos (float): Segundos máximos entre puntos de control
+            tamano_bloque (int): Bytes leídos del mmap en cada bloque
+            reintentos (int): Reintentos por contraseña si falla la consulta a HIBP
+            espera_reintento (float): Segundos antes del primer reintento (se duplica)
+            exigir_hibp (bool): Si es True, un fallo persistente de HIBP detiene la
+                auditoría en lugar de contar la contraseña como no filtrada
+            clase_resumen (type): Clase de los agregados (agregar, fusionar,
+                a_dict, desde_dict)
+            silencioso (bool): No mostrar el progreso en stderr
+
+        Raises:
+            ValueError: Si el punto de control no corresponde a este archivo o fragmento
+        """
+        self.validador = validador
+        self.ruta = os.path.abspath(ruta)
+        self.ruta_checkpoint = ruta_checkpoint
+        self.tamano = os.path.getsize(ruta)
+        self.huella = huella_archivo(ruta)
+        self.inicio = inicio
+        self.fin = self.tamano if fin is None else min(fin, self.tamano)
+        self.cada_lineas = cada_lineas
+        self.cada_segundos = cada_segundos
+        self.tamano_bloque = tamano_bloque
+        self.reintentos = reintentos
+        self.espera_reintento = espera_reintento
+        self.exigir_hibp = exigir_hibp
+        self.clase_resumen = clase_resumen
+        self.silencioso = silencioso
+
+        self.offset = None
+        self.lineas = 0
+        self.invalidas = 0
+        self.completada = False
+        self.resumen = clase_resumen()
+
+        # Prefijos ya escritos en el registro de caché HIBP
+        self._prefijos_guardados = set()
+
+        if ruta_checkpoint and os.path.exists(ruta_checkpoint):
+            self._cargar_checkpoint()
+
+    def ejecutar(self):
+        """
+        Procesa el archivo desde el último punto de control hasta el final del fragmento.
+
+        Returns:
+            AgregadorEstadisticas: Los agregados del fragmento completo
+
+        Raises:
+            AuditoriaInterrumpida: Si HIBP falla de forma persistente (con exigir_hibp)
+        """
+        if self.completada:
+            return self.resumen
+
+        self._ultimo_checkpoint = time.monotonic()
+        self._lineas_desde_checkpoint = 0
+
+        with open(self.ruta, 'rb') as archivo:
+            if self.tamano == 0:
+                mapa = b''
+            else:
+                mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                if self.offset is None:
+                    self.offset = _inicio_de_linea(mapa, self.inicio)
+                self._procesar(mapa)
+            finally:
+                if isinstance(mapa, mmap.mmap):
+                    mapa.close()
+
+        self.completada = True
+        self.guardar_checkpoint()
+        return self.resumen
+
+    def _procesar(self, mapa):
+        """
+        Recorre el mmap en bloques que terminan en fin de línea.
+        """
+        posicion = self.offset
+        while posicion < self.fin:
+            limite = min(posicion + self.tamano_bloque, self.tamano)
+            if limite < self.tamano:
+                salto = mapa.rfind(b'\n', posicion, limite)
+                if salto < 0:
+                    salto = mapa.find(b'\n', limite)
+                limite = self.tamano if salto < 0 else salto + 1
+
+            inicio_linea = posicion
+            for linea in mapa[posicion:limite].split(b'\n'):
+                # Solo se procesan las líneas que empiezan dentro del fragmento
+                if inicio_linea >= self.fin or inicio_linea >= limite:
+                    break
+                siguiente = inicio_linea + len(linea) + 1
+                self._validar_linea(linea, inicio_linea)
+                self.offset = min(siguiente, self.tamano)
+                inicio_linea = siguiente
+
+                self._lineas_desde_checkpoint += 1
+                if (self._lineas_desde_checkpoint >= self.cada_lineas
+                        or time.monotonic() - self._ultimo_checkpoint >= self.cada_segundos):
+                    self.guardar_checkpoint()
+
+            posicion = min(inicio_linea, self.tamano)
+
+    def _validar_linea(self, linea, inicio_linea):
+        """
+        Valida una línea y la incorpora a los agregados.
+        """
+        linea = linea.rstrip(b'\r')
+        if not linea:
+            return
+        try:
+            contrasena = linea.decode('utf-8')
+        except UnicodeDecodeError:
+            self.invalidas += 1
+            return
+
+        for intento in range(self.reintentos + 1):
+            resultado = self.validador.validar(contrasena)
+            error = resultado['criterios']['filtrada']['error']
+            if not error or not self.exigir_hibp:
+                break
+            if intento < self.reintentos:
+                time.sleep(self.espera_reintento * 2 ** intento)
+        else:
+            # Guardar el punto de control antes de esta línea para reintentarla al reanudar
+            self.offset = inicio_linea
+            self.guardar_checkpoint()
+            raise AuditoriaInterrumpida(f'HIBP no disponible en el offset {inicio_linea}: {error}')
+
+        self.resumen.agregar(resultado, contrasena, self.validador.contrasenas_comunes)
+        self.lineas += 1
+
+    def guardar_checkpoint(self):
+        """
+        Guarda el punto de control (si hay ruta configurada).
+        """
+        self._ultimo_checkpoint = time.monotonic()
+        self._lineas_desde_checkpoint = 0
+        if not self.ruta_checkpoint:
+            return
+
+        ruta_cache = None
+        checker = self.validador.hibp_checker
+        if checker.tamano_cache > 0 and not self.completada:
+            ruta_cache = f'{self.ruta_checkpoint}.hibp'
+            self._guardar_cache_hibp(ruta_cache, checker)
+
+        estado = {
+            'version': VERSION_CHECKPOINT,
+            'ruta': self.ruta,
+            'tamano': self.tamano,
+            'huella': self.huella,
+            'inicio': self.inicio,
+            'fin': self.fin,
+            'offset': self.offset,
+            'completada': self.completada,
+            'lineas': self.lineas,
+            'invalidas': self.invalidas,
+            'resumen': self.resumen.a_dict(),
+            'cache_hibp': os.path.basename(ruta_cache) if ruta_cache else None
+        }
+
+        _escribir_atomico(
+            self.ruta_checkpoint,
+            lambda destino: json.dump(estado, destino, ensure_ascii=False, indent=2)
+        )
+
+        # Un fragmento completado ya no necesita la caché
+        if self.completada and os.path.exists(f'{self.ruta_checkpoint}.hibp'):
+            os.remove(f'{self.ruta_checkpoint}.hibp')
+
+        if not self.silencioso:
+            procesado = (self.offset or self.inicio) - self.inicio
+            total = max(1, self.fin - self.inicio)
+            sys.stderr.write(f'\rPunto de control: {self.lineas:,} contraseñas, '
+                             f'{procesado * 100 / total:.1f}% del fragmento')
+            sys.stderr.flush()
+
+    def _guardar_cache_hibp(self, ruta_cache, checker):
+        """
+        Añade al registro de caché los prefijos descargados desde el último punto
+        de control. El registro se limita a tamano_cache prefijos, así que nunca
+        ocupa más que la caché llena.
+        """
+        disponibles = checker.tamano_cache - len(self._prefijos_guardados)
+        if disponibles <= 0:
+            return
+
+        nuevos = {}
+        for prefijo, rango in checker.exportar_cache().items():
+            if prefijo not in self._prefijos_guardados:
+                nuevos[prefijo] = rango
+                if len(nuevos) >= disponibles:
+                    break
+        if nuevos:
+            anadir_cache_hibp(ruta_cache, nuevos)
+            self._prefijos_guardados.update(nuevos)
+
+    def _cargar_checkpoint(self):
+        """
+        Restaura el estado desde el punto de control.
+        """
+        with open(self.ruta_checkpoint, 'r', encoding='utf-8') as origen:
+            estado = json.load(origen)
+
+        if estado.get('version') != VERSION_CHECKPOINT:
+            raise ValueError(f'Versión de punto de control no soportada: {estado.get("version")}')
+        if (estado['tamano'], estado['huella']) != (self.tamano, self.huella):
+            raise ValueError('El archivo de entrada ha cambiado desde el punto de control')
+        if (estado['inicio'], estado['fin']) != (self.inicio, self.fin):
+            raise ValueError('El punto de control corresponde a otro fragmento del archivo')
+
+        self.offset = estado['offset']
+        self.completada = estado['completada']
+        self.lineas = estado['lineas']
+        self.invalidas = estado['invalidas']
+        self.resumen = self.clase_resumen.desde_dict(estado['resumen'])
+
+        if estado['cache_hibp']:
+            ruta_cache = os.path.join(os.path.dirname(self.ruta_checkpoint), estado['cache_hibp'])
+            if os.path.exists(ruta_cache):
+                rangos, validos = cargar_cache_hibp(ruta_cache)
+                # Descartar una entrada a medio escribir para poder seguir añadiendo
+                if validos < os.path.getsize(ruta_cache):
+                    with open(ruta_cache, 'r+b') as registro:
+                        registro.truncate(validos)
+                self.validador.hibp_checker.importar_cache(rangos)
+                self._prefijos_guardados.update(rangos)
+
+
+def elegir_politica(ruta, nombre=None):
+    """
+    Carga la política con la que se puntúa la auditoría.
+
+    Args:
+        ruta (str): Archivo de políticas (JSON o YAML)
+        nombre (str | None): Nombre de la política a usar; obligatorio si el
+            archivo contiene varias
+
+    Returns:
+        Politica: La política elegida
+
+    Raises:
+        ValueError: Si la política no existe o si hay varias y no se indica cuál
+    """
+    politicas = cargar_politica(ruta)
+    if not isinstance(politicas, list):
+        politicas = [politicas]
+
+    nombres = [politica.nombre for politica in politicas]
+    if nombre is None:
+        if len(politicas) != 1:
+            raise ValueError(f'{ruta} contiene varias políticas ({", ".join(nombres)}); '
+                             'indica cuál usar con --nombre-politica')
+        return politicas[0]
+    if nombre not in nombres:
+        raise ValueError(f'{ruta} no contiene la política "{nombre}" (disponibles: {", ".join(nombres)})')
+    return politicas[nombres.index(nombre)]
+
+
+def crear_validador(opciones):
+    """
+    Crea un validador a partir de opciones serializables (para los procesos del pool).
+
+    Args:
+        opciones (dict): Claves opcionales 'tamano_cache', 'ruta_contrasenas_comunes',
+            'ruta_politica', 'nombre_politica', 'cache_hibp' y 'formato_rangos'
+
+    Returns:
+        ValidadorContrasena: El validador configurado
+
+    Raises:
+        ValueError: Si la política no se puede elegir (ver elegir_politica)
+    """
+    politica = None
+    if opciones.get('ruta_politica'):
+        politica = elegir_politica(opciones['ruta_politica'], opciones.get('nombre_politica'))
+
+    validador = ValidadorContrasena(
+        tamano_cache=opciones.get('tamano_cache', 0),
+        politica=politica,
+        ruta_contrasenas_comunes=opciones.get('ruta_contrasenas_comunes')
+    )
+    validador.hibp_checker = HIBPChecker(
+        tamano_cache=opciones.get('cache_hibp', 0),
+        formato_rangos=opciones.get('formato_rangos', 'completo')
+    )
+    return validador
+
+
+def ruta_checkpoint_fragmento(ruta_checkpoint, indice):
+    """
+    Devuelve la ruta del punto de control de un fragmento (auditoria.json -> auditoria.frag3.json).
+    """
+    base, extension = os.path.splitext(ruta_checkpoint)
+    return f'{base}.frag{indice}{extension or ".json"}'
+
+
+def auditar_fragmento(ruta, ruta_checkpoint, inicio, fin, opciones, parametros=None):
+    """
+    Audita un fragmento con un validador propio. Pensado para ejecutarse en otro proceso.
+
+    Args:
+        ruta (str): Archivo de entrada
+        ruta_checkpoint (str): Punto de control del fragmento
+        inicio (int): Offset de inicio
+        fin (int): Offset de fin (exclusivo)
+        opciones (dict): Opciones del validador (ver crear_validador)
+        parametros (dict | None): Argumentos adicionales para Auditoria
+
+    Returns:
+        dict: Agregados del fragmento (AgregadorEstadisticas.a_dict)
+    """
+    auditoria = Auditoria(crear_validador(opciones), ruta, ruta_checkpoint, inicio, fin,
+                          **(parametros or {}))
+    return auditoria.ejecutar().a_dict()
+
+
+def auditar_en_paralelo(ruta, ruta_checkpoint, fragmentos, procesos, opciones, parametros=None):
+    """
+    Divide el archivo en fragmentos y los audita en un pool de procesos.
+
+    Cada fragmento guarda su propio punto de control, así que si se relanza con los
+    mismos argumentos solo se repite el trabajo pendiente.
+
+    Args:
+        ruta (str): Archivo de entrada
+        ruta_checkpoint (str): Ruta base de los puntos de control
+        fragmentos (int): Número de fragmentos
+        procesos (int): Procesos del pool
+        opciones (dict): Opciones del validador (ver crear_validador)
+        parametros (dict | None): Argumentos adicionales para Auditoria
+
+    Returns:
+        AgregadorEstadisticas: Agregados fusionados de todos los fragmentos
+    """
+    resumen = AgregadorEstadisticas()
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = [
+            pool.submit(auditar_fragmento, ruta, ruta_checkpoint_fragmento(ruta_checkpoint, i),
+                        inicio, fin, opciones, parametros)
+            for i, (inicio, fin) in enumerate(dividir_en_fragmentos(ruta, fragmentos))
+        ]
+        for futuro in futuros:
+            resumen.fusionar(AgregadorEstadisticas.desde_dict(futuro.result()))
+    return resumen
+
+
+def fusionar_checkpoints(rutas, clase_resumen=AgregadorEstadisticas):
+    """
+    Fusiona los agregados de puntos de control de fragmentos completados
+    (por ejemplo, procesados en máquinas distintas).
+
+    Los fragmentos deben ser del mismo archivo (mismo tamaño y misma huella de
+    contenido, aunque esté en rutas distintas) y cubrir [0, tamaño) exactamente,
+    sin huecos ni solapamientos, para no perder ni contar dos veces ninguna línea.
+
+    Args:
+        rutas (list[str]): Puntos de control de los fragmentos
+        clase_resumen (type): Clase de los agregados
+
+    Returns:
+        AgregadorEstadisticas: Agregados fusionados
+
+    Raises:
+        ValueError: Si algún punto de control es de otra versión o de otro archivo,
+            si algún fragmento no se ha completado o si los fragmentos no cubren
+            el archivo exactamente
+    """
+    estados = []
+    for ruta in rutas:
+        with open(ruta, 'r', encoding='utf-8') as origen:
+            estado = json.load(origen)
+        if estado.get('version') != VERSION_CHECKPOINT:
+            raise ValueError(f'Versión de punto de control no soportada en {ruta}: {estado.get("version")}')
+        estados.append((ruta, estado))
+
+    if not estados:
+        raise ValueError('No hay puntos de control que fusionar')
+
+    _, primero = estados[0]
+    for ruta, estado in estados[1:]:
+        if (estado['tamano'], estado['huella']) != (primero['tamano'], primero['huella']):
+            raise ValueError(f'{ruta} corresponde a otro archivo de entrada')
+
+    pendientes = [ruta for ruta, estado in estados if not estado['completada']]
+    if pendientes:
+        raise ValueError(f'Fragmentos sin completar: {", ".join(pendientes)}')
+
+    # Los rangos [inicio, fin) ordenados deben encadenarse de 0 al tamaño del archivo
+    posicion = 0
+    for ruta, estado in sorted(estados, key=lambda par: (par[1]['inicio'], par[1]['fin'])):
+        if estado['inicio'] != posicion:
+            motivo = 'se solapa con otro fragmento' if estado['inicio'] < posicion else 'deja un hueco antes'
+            raise ValueError(f'{ruta} ({estado["inicio"]}-{estado["fin"]}) {motivo}')
+        posicion = estado['fin']
+    if posicion != primero['tamano']:
+        raise ValueError(f'Falta el final del archivo: bytes {posicion}-{primero["tamano"]}')
+
+    resumen = clase_resumen()
+    for _, estado in estados:
+        resumen.fusionar(clase_resumen.desde_dict(estado['resumen']))
+    return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Auditoría reanudable de listas de contraseñas.')
+    parser.add_argument('entrada', nargs='?', help='archivo con una contraseña por línea')
+    parser.add_argument('--checkpoint', help='archivo JSON del punto de control')
+    parser.add_argument('--fragmentos', type=int, default=1, help='número de fragmentos del archivo')
+    parser.add_argument('--fragmento', type=int, help='procesar solo este fragmento (0..N-1)')
+    parser.add_argument('--procesos', type=int, help='auditar todos los fragmentos en paralelo')
+    parser.add_argument('--fusionar', nargs='+', metavar='CHECKPOINT',
+                        help='fusionar puntos de control de fragmentos completados')
+    parser.add_argument('--lista', help='lista de contraseñas comunes (.txt, .idx o .bloom)')
+    parser.add_argument('--politica', help='política de puntuación (JSON o YAML)')
+    parser.add_argument('--nombre-politica',
+                        help='política a usar si el archivo de --politica contiene varias')
+    parser.add_argument('--cache-hibp', type=int, default=10000,
+                        help='prefijos HIBP en caché por proceso, unos 8.5 KB cada uno '
+                             '(por defecto 10000, ~85 MB)')
+    parser.add_argument('--cada-lineas', type=int, default=10000,
+                        help='líneas entre puntos de control (por defecto 10000)')
+    parser.add_argument('--sin-exigir-hibp', action='store_true',
+                        help='contar como no filtradas las contraseñas si HIBP falla')
+    args = parser.parse_args()
+
+    if args.fusionar:
+        try:
+            resumen = fusionar_checkpoints(args.fusionar)
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        if not args.entrada or not args.checkpoint:
+            parser.error('se necesitan la entrada y --checkpoint')
+        if args.fragmentos < 1:
+            parser.error('--fragmentos debe ser al menos 1')
+        if args.fragmento is not None and not 0 <= args.fragmento < args.fragmentos:
+            parser.error(f'--fragmento debe estar entre 0 y {args.fragmentos - 1}')
+        if args.procesos is not None and args.procesos < 1:
+            parser.error('--procesos debe ser al menos 1')
+        if args.nombre_politica and not args.politica:
+            parser.error('--nombre-politica requiere --politica')
+        if args.politica:
+            # Comprobar la política aquí para no fallar dentro de cada proceso
+            try:
+                elegir_politica(args.politica, args.nombre_politica)
+            except (OSError, ImportError, ValueError) as e:
+                parser.error(str(e))
+
+        opciones = {
+            'ruta_contrasenas_comunes': args.lista,
+            'ruta_politica': args.politica,
+            'nombre_politica': args.nombre_politica,
+            'cache_hibp': args.cache_hibp,
+            'formato_rangos': 'huella'
+        }
+        parametros = {
+            'cada_lineas': args.cada_lineas,
+            'exigir_hibp': not args.sin_exigir_hibp
+        }
+
+        try:
+            if args.fragmento is not None:
+                inicio, fin = dividir_en_fragmentos(args.entrada, args.fragmentos)[args.fragmento]
+                resumen = AgregadorEstadisticas.desde_dict(auditar_fragmento(
+                    args.entrada, args.checkpoint, inicio, fin, opciones, parametros
+                ))
+            elif args.fragmentos > 1:
+                resumen = auditar_en_paralelo(args.entrada, args.checkpoint, args.fragmentos,
+                                              args.procesos or args.fragmentos, opciones, parametros)
+            else:
+                parametros['silencioso'] = False
+                auditoria = Auditoria(crear_validador(opciones), args.entrada, args.checkpoint,
+                                      **parametros)
+                resumen = auditoria.ejecutar()
+        except AuditoriaInterrumpida as e:
+            print(f'\n⚠️ Auditoría interrumpida: {e}. Vuelve a ejecutar el mismo comando para reanudar.',
+                  file=sys.stderr)
+            sys.exit(1)
+
+    print(json.dumps(resumen.informe(), ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark del almacenamiento compacto de rangos HIBP.
+Compara los bytes por prefijo en caché y la velocidad de búsqueda frente a
+guardar el texto de la respuesta (response.text) tal cual.
+
+Uso:
+    python benchmarks/bench_rangos.py [--prefijos N] [--entradas N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hibp_rangos import FORMATO_COMPLETO, FORMATO_HUELLA, RangoCompacto
+
+
+def generar_respuesta(entradas, rng):
+    """
+    Genera una respuesta sintética con el mismo formato que la API.
+
+    Args:
+        entradas (int): Número de líneas SUFIJO:CANTIDAD
+        rng (random.Random): Generador de números aleatorios
+
+    Returns:
+        str: Texto de la respuesta
+    """
+    lineas = []
+    for _ in range(entradas):
+        sufijo = f'{rng.getrandbits(140):035X}'
+        lineas.append(f'{sufijo}:{int(rng.paretovariate(0.8))}')
+    return '\r\n'.join(lineas)
+
+
+def buscar_en_texto(sufijo, respuesta):
+    """
+    Búsqueda lineal sobre el texto, equivalente al método original del cliente.
+    """
+    for linea in respuesta.split('\n'):
+        if ':' in linea:
+            hash_sufijo, cantidad = linea.split(':')
+            if hash_sufijo.strip().upper() == sufijo.upper():
+                return int(cantidad.strip())
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--prefijos', type=int, default=200)
+    parser.add_argument('--entradas', type=int, default=900,
+                        help='líneas por prefijo (la API devuelve ~800-1000)')
+    parser.add_argument('--busquedas', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    respuestas = [generar_respuesta(args.entradas, rng) for _ in range(args.prefijos)]
+
+    # Mitad de búsquedas con acierto, mitad sin acierto
+    consultas = []
+    for _ in range(args.busquedas):
+        respuesta = rng.choice(respuestas)
+        if rng.random() < 0.5:
+            sufijo = rng.choice(respuesta.split('\r\n')).split(':')[0]
+        else:
+            sufijo = f'{rng.getrandbits(140):035X}'
+        consultas.append((sufijo, respuesta))
+
+    bytes_texto = sum(sys.getsizeof(r) for r in respuestas) / args.prefijos
+    print(f'{"almacenamiento":<16}{"bytes/prefijo":>15}{"ratio":>8}{"µs/búsqueda":>14}')
+
+    tiempo = timeit.timeit(lambda: [buscar_en_texto(s, r) for s, r in consultas], number=1)
+    print(f'{"texto":<16}{bytes_texto:>15.0f}{1.0:>8.2f}{tiempo / len(consultas) * 1e6:>14.1f}')
+
+    for formato in (FORMATO_COMPLETO, FORMATO_HUELLA):
+        rangos = {id(r): RangoCompacto.desde_texto(r, formato) for r in respuestas}
+        bytes_rango = sum(r.tamano_bytes() for r in rangos.values()) / args.prefijos
+        pares = [(s, rangos[id(r)]) for s, r in consultas]
+        tiempo = timeit.timeit(lambda: [rango.buscar(s) for s, rango in pares], number=1)
+        print(f'{formato:<16}{bytes_rango:>15.0f}{bytes_texto / bytes_rango:>8.2f}'
+              f'{tiempo / len(pares) * 1e6:>14.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Caché de resultados de validación.
+Memoriza los resultados de ValidadorContrasena indexados por un HMAC de la
+contraseña, de forma que nunca se guarda la contraseña en texto plano.
+"""
+
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+# Secreto aleatorio por proceso: las claves no son comparables entre procesos
+# ni reversibles sin acceso a la memoria del proceso
+_SECRETO = secrets.token_bytes(32)
+
+
+class CacheResultados:
+    """
+    Caché LRU acotada de resultados de validación.
+
+    Cada entrada guarda el resultado completo junto con el instante en que
+    caduca su parte de HIBP. Mientras no caduque, una validación repetida
+    cuesta solo un HMAC y una búsqueda; cuando caduca, los criterios locales
+    se reutilizan y solo se vuelve a consultar HIBP.
+    """
+
+    def __init__(self, tamano_maximo=1024, ttl_hibp=3600):
+        """
+        Inicializa la caché.
+
+        Args:
+            tamano_maximo (int): Número máximo de resultados guardados
+            ttl_hibp (float): Segundos durante los que se reutiliza el resultado de HIBP
+        """
+        self.tamano_maximo = tamano_maximo
+        self.ttl_hibp = ttl_hibp
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self._aciertos = 0
+        self._aciertos_parciales = 0
+        self._fallos = 0
+
+    def clave(self, contrasena):
+        """
+        Calcula la clave de caché de una contraseña.
+
+        Args:
+            contrasena (str): La contraseña
+
+        Returns:
+            bytes: HMAC-SHA256 de la contraseña con el secreto del proceso
+        """
+        return hmac.new(_SECRETO, contrasena.encode('utf-8'), hashlib.sha256).digest()
+
+    def obtener(self, clave):
+        """
+        Busca un resultado en la caché.
+
+        Args:
+            clave (bytes): Clave calculada con clave()
+
+        Returns:
+            tuple | None: (resultado, hibp_vigente) o None si no está en caché
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self._fallos += 1
+                return None
+
+            self._entradas.move_to_end(clave)
+            resultado, expira_hibp = entrada
+            hibp_vigente = time.monotonic() < expira_hibp
+            if hibp_vigente:
+                self._aciertos += 1
+            else:
+                self._aciertos_parciales += 1
+            return resultado, hibp_vigente
+
+    def guardar(self, clave, resultado):
+        """
+        Guarda un resultado en la caché, descartando el menos usado si está llena.
+
+        Si la consulta a HIBP falló, la parte de HIBP se marca como caducada para
+        que se reintente en la siguiente validación.
+
+        Args:
+            clave (bytes): Clave calculada con clave()
+            resultado (dict): Resultado devuelto por ValidadorContrasena.validar
+        """
+        if resultado['criterios']['filtrada']['error']:
+            expira_hibp = 0
+        else:
+            expira_hibp = time.monotonic() + self.ttl_hibp
+
+        with self._lock:
+            self._entradas[clave] = (resultado, expira_hibp)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.tamano_maximo:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self):
+        """
+        Vacía la caché (por ejemplo, al cambiar la lista de contraseñas comunes).
+        """
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self):
+        """
+        Devuelve las estadísticas de uso de la caché.
+
+        Returns:
+            dict: Diccionario con la estructura:
+                {
+                    'aciertos': int,
+                    'aciertos_parciales': int,
+                    'fallos': int,
+                    'tasa_aciertos': float,
+                    'tamano': int,
+                    'tamano_maximo': int
+                }
+        """
+        with self._lock:
+            consultas = self._aciertos + self._aciertos_parciales + self._fallos
+            return {
+                'aciertos': self._aciertos,
+                'aciertos_parciales': self._aciertos_parciales,
+                'fallos': self._fallos,
+                'tasa_aciertos': self._aciertos / consultas if consultas else 0.0,
+                'tamano': len(self._entradas),
+                'tamano_maximo': self.tamano_maximo
+            }
@@ -0,0 +1,494 @@
+# -*- coding: utf-8 -*-
+"""
+Estadísticas agregadas de validaciones en streaming.
+Resume millones de validaciones en memoria acotada usando contadores de tamaño
+fijo y estructuras probabilísticas (t-digest para cuantiles y count-min sketch
+para los elementos más frecuentes). Todos los agregados se pueden fusionar entre
+procesos y convertir a dict para guardarlos en JSON.
+"""
+
+import hashlib
+import math
+from array import array
+
+from indice_contrasenas import es_exacta, huella
+
+CUANTILES_INFORME = (0.5, 0.9, 0.99, 0.999)
+
+CLASES_COMPLEJIDAD = ('mayusculas', 'minusculas', 'numeros', 'especiales')
+FLAGS_PATRONES = ('secuencias_numericas', 'secuencias_alfabeticas', 'repeticiones')
+
+
+class TDigest:
+    """
+    Resumen de una distribución para estimar cuantiles (t-digest con fusión).
+
+    Mantiene como mucho del orden de `compresion` centroides, con más resolución
+    en las colas de la distribución, independientemente de cuántos valores reciba.
+    """
+
+    def __init__(self, compresion=100):
+        """
+        Args:
+            compresion (int): Parámetro de compresión (más alto = más preciso y más grande)
+        """
+        self.compresion = compresion
+        self.total = 0
+        self.minimo = None
+        self.maximo = None
+        self._centroides = []
+        self._buffer = []
+
+    def agregar(self, valor, peso=1):
+        """
+        Añade un valor.
+
+        Args:
+            valor (float): El valor observado
+            peso (int): Número de veces que se observa
+        """
+        self._buffer.append((valor, peso))
+        self.total += peso
+        if self.minimo is None or valor < self.minimo:
+            self.minimo = valor
+        if self.maximo is None or valor > self.maximo:
+            self.maximo = valor
+        if len(self._buffer) >= 5 * self.compresion:
+            self._comprimir()
+
+    def fusionar(self, otro):
+        """
+        Incorpora los valores resumidos por otro t-digest.
+
+        Args:
+            otro (TDigest): El t-digest a fusionar
+        """
+        if not otro.total:
+            return
+        self._buffer.extend(otro._centroides)
+        self._buffer.extend(otro._buffer)
+        self.total += otro.total
+        self.minimo = otro.minimo if self.minimo is None else min(self.minimo, otro.minimo)
+        self.maximo = otro.maximo if self.maximo is None else max(self.maximo, otro.maximo)
+        self._comprimir()
+
+    def cuantil(self, q):
+        """
+        Estima el cuantil q.
+
+        Args:
+            q (float): Cuantil entre 0 y 1
+
+        Returns:
+            float | None: Valor estimado (None si no hay datos)
+        """
+        if not self.total:
+            return None
+        self._comprimir()
+
+        objetivo = q * self.total
+        # Interpolación lineal entre los centros de los centroides
+        anterior_posicion, anterior_valor = 0.0, self.minimo
+        acumulado = 0.0
+        for media, peso in self._centroides:
+            centro = acumulado + peso / 2
+            if objetivo < centro:
+                return self._interpolar(objetivo, anterior_posicion, anterior_valor, centro, media)
+            anterior_posicion, anterior_valor = centro, media
+            acumulado += peso
+        return self._interpolar(objetivo, anterior_posicion, anterior_valor, self.total, self.maximo)
+
+    def a_dict(self):
+        """
+        Returns:
+            dict: Representación serializable en JSON
+        """
+        self._comprimir()
+        return {
+            'compresion': self.compresion,
+            'total': self.total,
+            'minimo': self.minimo,
+            'maximo': self.maximo,
+            'centroides': [[media, peso] for media, peso in self._centroides]
+        }
+
+    @classmethod
+    def desde_dict(cls, datos):
+        """
+        Args:
+            datos (dict): Representación generada por a_dict()
+
+        Returns:
+            TDigest: El t-digest reconstruido
+        """
+        digest = cls(datos['compresion'])
+        digest.total = datos['total']
+        digest.minimo = datos['minimo']
+        digest.maximo = datos['maximo']
+        digest._centroides = [(media, peso) for media, peso in datos['centroides']]
+        return digest
+
+    def _interpolar(self, objetivo, x0, y0, x1, y1):
+        if x1 <= x0:
+            return y1
+        return y0 + (y1 - y0) * (objetivo - x0) / (x1 - x0)
+
+    def _limite(self, q, normalizador):
+        # Función de escala k2: centroides más pequeños cuanto más cerca de las colas
+        q = min(max(q, 1e-12), 1 - 1e-12)
+        return self.compresion / normalizador * math.log(q / (1 - q))
+
+    def _comprimir(self):
+        """
+        Fusiona el buffer con los centroides respetando la función de escala.
+        """
+        if not self._buffer:
+            return
+        puntos = sorted(self._centroides + self._buffer)
+        self._buffer = []
+
+        normalizador = 4 * math.log(max(self.total / self.compresion, 1.0)) + 24
+
+        centroides = []
+        media, peso = puntos[0]
+        procesado = 0
+        for siguiente_media, siguiente_peso in puntos[1:]:
+            q_inicio = procesado / self.total
+            q_fin = (procesado + peso + siguiente_peso) / self.total
+            if self._limite(q_fin, normalizador) - self._limite(q_inicio, normalizador) <= 1:
+                peso += siguiente_peso
+                media += (siguiente_media - media) * siguiente_peso / peso
+            else:
+                centroides.append((media, peso))
+                procesado += peso
+                media, peso = siguiente_media, siguiente_peso
+        centroides.append((media, peso))
+        self._centroides = centroides
+
+
+class ElementosFrecuentes:
+    """
+    Los k elementos más frecuentes de un flujo (heavy hitters).
+
+    Las frecuencias se estiman con un count-min sketch de tamaño fijo (nunca
+    subestima; sobreestima como mucho en ~2/ancho del total con probabilidad
+    1 - (1/2)^profundidad) y solo se guardan k candidatos.
+    """
+
+    def __init__(self, k=20, ancho=2048, profundidad=4):
+        """
+        Args:
+            k (int): Número de elementos a conservar
+            ancho (int): Contadores por fila del sketch
+            profundidad (int): Filas (funciones hash) del sketch
+        """
+        self.k = k
+        self.ancho = ancho
+        self.profundidad = profundidad
+        self._filas = [array('Q', bytes(8 * ancho)) for _ in range(profundidad)]
+        self._candidatos = {}
+
+    def agregar(self, elemento, cantidad=1):
+        """
+        Cuenta una aparición del elemento.
+
+        Args:
+            elemento (str): El elemento observado
+            cantidad (int): Número de apariciones
+        """
+        estimacion = None
+        for fila, posicion in zip(self._filas, self._posiciones(elemento)):
+            fila[posicion] += cantidad
+            if estimacion is None or fila[posicion] < estimacion:
+                estimacion = fila[posicion]
+        self._actualizar_candidato(elemento, estimacion)
+
+    def estimar(self, elemento):
+        """
+        Estima la frecuencia de un elemento.
+
+        Args:
+            elemento (str): El elemento
+
+        Returns:
+            int: Frecuencia estimada (nunca menor que la real)
+        """
+        return min(fila[posicion] for fila, posicion in zip(self._filas, self._posiciones(elemento)))
+
+    def __contains__(self, elemento):
+        # Si el elemento está ahora mismo entre los k candidatos
+        return elemento in self._candidatos
+
+    def principales(self):
+        """
+        Returns:
+            list[tuple[str, int]]: Los elementos más frecuentes con su frecuencia
+                estimada, de mayor a menor
+        """
+        return sorted(self._candidatos.items(), key=lambda par: (-par[1], par[0]))
+
+    def fusionar(self, otro):
+        """
+        Incorpora los conteos de otro sketch con las mismas dimensiones.
+
+        Args:
+            otro (ElementosFrecuentes): El sketch a fusionar
+
+        Raises:
+            ValueError: Si las dimensiones no coinciden
+        """
+        if (self.ancho, self.profundidad) != (otro.ancho, otro.profundidad):
+            raise ValueError('No se pueden fusionar sketches de dimensiones distintas')
+        for fila, fila_otro in zip(self._filas, otro._filas):
+            for i, valor in enumerate(fila_otro):
+                if valor:
+                    fila[i] += valor
+
+        # Reestimar todos los candidatos con el sketch fusionado
+        candidatos = set(self._candidatos) | set(otro._candidatos)
+        estimaciones = sorted(((self.estimar(e), e) for e in candidatos), reverse=True)
+        self._candidatos = {e: estimacion for estimacion, e in estimaciones[:self.k]}
+
+    def a_dict(self):
+        """
+        Returns:
+            dict: Representación serializable en JSON
+        """
+        return {
+            'k': self.k,
+            'ancho': self.ancho,
+            'profundidad': self.profundidad,
+            'filas': [fila.tolist() for fila in self._filas],
+            'candidatos': dict(self._candidatos)
+        }
+
+    @classmethod
+    def desde_dict(cls, datos):
+        """
+        Args:
+            datos (dict): Representación generada por a_dict()
+
+        Returns:
+            ElementosFrecuentes: El sketch reconstruido
+        """
+        sketch = cls(datos['k'], datos['ancho'], datos['profundidad'])
+        sketch._filas = [array('Q', fila) for fila in datos['filas']]
+        sketch._candidatos = dict(datos['candidatos'])
+        return sketch
+
+    def _posiciones(self, elemento):
+        # Doble hashing: las filas usan h1 + i*h2 para no calcular un hash por fila
+        h = hashlib.blake2b(elemento.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(h[:8], 'big')
+        h2 = int.from_bytes(h[8:], 'big') | 1
+        return [(h1 + i * h2) % self.ancho for i in range(self.profundidad)]
+
+    def _actualizar_candidato(self, elemento, estimacion):
+        if elemento in self._candidatos or len(self._candidatos) < self.k:
+            self._candidatos[elemento] = estimacion
+            return
+        menor = min(self._candidatos, key=self._candidatos.get)
+        if estimacion > self._candidatos[menor]:
+            del self._candidatos[menor]
+            self._candidatos[elemento] = estimacion
+
+
+def _sumar_conteos(destino, origen):
+    for clave, cantidad in origen.items():
+        destino[clave] = destino.get(clave, 0) + cantidad
+
+
+class AgregadorEstadisticas:
+    """
+    Agregados de un flujo de validaciones en memoria acotada.
+
+    No guarda ningún resultado individual: solo contadores (niveles, histograma
+    de puntuaciones, clases de complejidad y patrones), un t-digest con las veces
+    que se han visto las contraseñas filtradas y los elementos más frecuentes de
+    la lista de contraseñas comunes. Su tamaño no depende del número de validaciones.
+
+    El top de comunes se cuenta por la huella de 64 bits de cada contraseña
+    (indice_contrasenas.huella). El texto solo se conserva para los candidatos
+    confirmados contra una lista exacta (conjunto o índice .idx); con un filtro
+    de Bloom, cuyos falsos positivos son contraseñas reales que no están en la
+    lista, el top muestra solo huellas.
+    """
+
+    def __init__(self, compresion=100, k=20, ancho=2048, profundidad=4):
+        """
+        Args:
+            compresion (int): Compresión del t-digest de filtraciones
+            k (int): Número de contraseñas comunes más frecuentes a conservar
+            ancho (int): Contadores por fila del count-min sketch
+            profundidad (int): Filas del count-min sketch
+        """
+        self.total = 0
+        self.comunes = 0
+        self.filtradas = 0
+        self.errores_hibp = 0
+        self.niveles = {}
+        self.puntuaciones = {}
+        self.tipos_usados = {}
+        self.complejidad = dict.fromkeys(CLASES_COMPLEJIDAD, 0)
+        self.patrones = dict.fromkeys(FLAGS_PATRONES, 0)
+        self.veces_vista = TDigest(compresion)
+        self.comunes_frecuentes = ElementosFrecuentes(k, ancho, profundidad)
+        # Texto de los candidatos del top confirmados contra una lista exacta
+        self.textos_comunes = {}
+
+    def agregar(self, resultado, contrasena=None, lista_comunes=None):
+        """
+        Incorpora el resultado de una validación.
+
+        Args:
+            resultado (dict): Resultado de ValidadorContrasena.validar
+            contrasena (str | None): La contraseña validada; solo se usa (en minúsculas)
+                si está en la lista de contraseñas comunes, para el top de comunes
+            lista_comunes (set | IndiceContrasenas | FiltroBloom | None): La lista
+                con la que se validó (validador.contrasenas_comunes). El texto solo
+                se guarda en el top si es exacta (conjunto o índice .idx); con un
+                filtro de Bloom, o si no se indica, el top muestra solo huellas
+        """
+        criterios = resultado['criterios']
+        self.total += 1
+
+        nivel = resultado['nivel']
+        self.niveles[nivel] = self.niveles.get(nivel, 0) + 1
+        puntuacion = resultado['puntuacion']
+        self.puntuaciones[puntuacion] = self.puntuaciones.get(puntuacion, 0) + 1
+
+        complejidad = criterios['complejidad']
+        tipos = complejidad['tipos_usados']
+        self.tipos_usados[tipos] = self.tipos_usados.get(tipos, 0) + 1
+        for clase in CLASES_COMPLEJIDAD:
+            self.complejidad[clase] += complejidad[clase]
+
+        patrones = criterios['patrones']
+        for flag in FLAGS_PATRONES:
+            self.patrones[flag] += patrones[flag]
+
+        if criterios['comun']:
+            self.comunes += 1
+            if contrasena is not None:
+                texto = contrasena.lower()
+                clave = f'{huella(texto):016x}'
+                self.comunes_frecuentes.agregar(clave)
+                if es_exacta(lista_comunes) and clave in self.comunes_frecuentes:
+                    self.textos_comunes[clave] = texto
+                    if len(self.textos_comunes) > 2 * self.comunes_frecuentes.k:
+                        self._podar_textos()
+
+        filtrada = criterios['filtrada']
+        if filtrada['error']:
+            self.errores_hibp += 1
+        if filtrada['filtrada']:
+            self.filtradas += 1
+            self.veces_vista.agregar(filtrada['veces_vista'])
+
+    def fusionar(self, otro):
+        """
+        Suma los agregados de otro agregador (por ejemplo, de otro proceso).
+
+        Args:
+            otro (AgregadorEstadisticas): El agregador a fusionar
+        """
+        self.total += otro.total
+        self.comunes += otro.comunes
+        self.filtradas += otro.filtradas
+        self.errores_hibp += otro.errores_hibp
+        _sumar_conteos(self.niveles, otro.niveles)
+        _sumar_conteos(self.puntuaciones, otro.puntuaciones)
+        _sumar_conteos(self.tipos_usados, otro.tipos_usados)
+        _sumar_conteos(self.complejidad, otro.complejidad)
+        _sumar_conteos(self.patrones, otro.patrones)
+        self.veces_vista.fusionar(otro.veces_vista)
+        self.comunes_frecuentes.fusionar(otro.comunes_frecuentes)
+        self.textos_comunes.update(otro.textos_comunes)
+        self._podar_textos()
+
+    def informe(self):
+        """
+        Genera el informe legible de los agregados.
+
+        Returns:
+            dict: Totales, distribuciones, cuantiles de filtraciones y top de
+                contraseñas comunes
+        """
+        return {
+            'total': self.total,
+            'comunes': self.comunes,
+            'filtradas': self.filtradas,
+            'errores_hibp': self.errores_hibp,
+            'niveles': dict(sorted(self.niveles.items(), key=lambda par: -par[1])),
+            'puntuaciones': dict(sorted(self.puntuaciones.items())),
+            'tipos_usados': dict(sorted(self.tipos_usados.items())),
+            'complejidad': dict(self.complejidad),
+            'patrones': dict(self.patrones),
+            'veces_vista': {
+                'minimo': self.veces_vista.minimo,
+                'maximo': self.veces_vista.maximo,
+                'cuantiles': {
+                    f'p{q * 100:g}': self.veces_vista.cuantil(q) for q in CUANTILES_INFORME
+                }
+            },
+            'comunes_frecuentes': [
+                (self.textos_comunes.get(clave, f'huella:{clave}'), cantidad)
+                for clave, cantidad in self.comunes_frecuentes.principales()
+            ]
+        }
+
+    def a_dict(self):
+        """
+        Returns:
+            dict: Representación serializable en JSON
+        """
+        return {
+            'total': self.total,
+            'comunes': self.comunes,
+            'filtradas': self.filtradas,
+            'errores_hibp': self.errores_hibp,
+            'niveles': dict(self.niveles),
+            'puntuaciones': {str(p): c for p, c in self.puntuaciones.items()},
+            'tipos_usados': {str(t): c for t, c in self.tipos_usados.items()},
+            'complejidad': dict(self.complejidad),
+            'patrones': dict(self.patrones),
+            'veces_vista': self.veces_vista.a_dict(),
+            'comunes_frecuentes': self.comunes_frecuentes.a_dict(),
+            'textos_comunes': {
+                clave: texto for clave, texto in self.textos_comunes.items()
+                if clave in self.comunes_frecuentes
+            }
+        }
+
+    @classmethod
+    def desde_dict(cls, datos):
+        """
+        Args:
+            datos (dict): Representación generada por a_dict()
+
+        Returns:
+            AgregadorEstadisticas: El agregador reconstruido
+        """
+        agregador = cls()
+        agregador.total = datos['total']
+        agregador.comunes = datos['comunes']
+        agregador.filtradas = datos['filtradas']
+        agregador.errores_hibp = datos['errores_hibp']
+        agregador.niveles = dict(datos['niveles'])
+        agregador.puntuaciones = {int(p): c for p, c in datos['puntuaciones'].items()}
+        agregador.tipos_usados = {int(t): c for t, c in datos['tipos_usados'].items()}
+        agregador.complejidad = dict(datos['complejidad'])
+        agregador.patrones = dict(datos['patrones'])
+        agregador.veces_vista = TDigest.desde_dict(datos['veces_vista'])
+        agregador.comunes_frecuentes = ElementosFrecuentes.desde_dict(datos['comunes_frecuentes'])
+        agregador.textos_comunes = dict(datos['textos_comunes'])
+        return agregador
+
+    def _podar_textos(self):
+        """
+        Descarta el texto de los elementos que ya no están entre los candidatos del top.
+        """
+        self.textos_comunes = {
+            clave: texto for clave, texto in self.textos_comunes.items()
+            if clave in self.comunes_frecuentes
+        }
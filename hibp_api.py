@@ -5,7 +5,52 @@ Verifica si una contraseña ha sido comprometida en filtraciones de datos usando
 """
 
 import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from hibp_rangos import FORMATO_COMPLETO, FORMATO_HUELLA, RangoCompacto
+
+
+class _LimitadorTasa:
+    """
+    Limitador de tasa global (token bucket) compartido por todos los hilos.
+    """
+
+    def __init__(self, peticiones_por_segundo):
+        """
+        Inicializa el limitador.
+
+        Args:
+            peticiones_por_segundo (float): Número máximo de peticiones por segundo
+        """
+        self.tasa = float(peticiones_por_segundo)
+        self.capacidad = max(1.0, self.tasa)
+        self._fichas = self.capacidad
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def adquirir(self):
+        """
+        Bloquea el hilo actual hasta que haya una ficha disponible.
+        """
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self._fichas = min(self.capacidad, self._fichas + (ahora - self._ultimo) * self.tasa)
+                self._ultimo = ahora
+
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return
+
+                espera = (1 - self._fichas) / self.tasa
+
+            time.sleep(espera)
 
 
 class HIBPChecker:
@@ -16,14 +61,104 @@ class HIBPChecker:
     
     API_URL = "https://api.pwnedpasswords.com/range/"
     
-    def __init__(self, timeout=5):
+    def __init__(self, timeout=5, max_hilos=8, peticiones_por_segundo=None,
+                 tamano_cache=0, formato_rangos=FORMATO_COMPLETO):
         """
         Inicializa el cliente HIBP.
         
         Args:
             timeout (int): Tiempo máximo de espera para las peticiones HTTP en segundos
+            max_hilos (int): Número de hilos del pool usado por verificar_muchas/futures
+            peticiones_por_segundo (float | None): Límite global de peticiones a la API
+                (None para no limitar)
+            tamano_cache (int): Número máximo de prefijos en la caché de rangos
+                (0 para desactivarla)
+            formato_rangos (str): Formato de los rangos en caché: 'completo'
+                (sufijos exactos) o 'huella' (64 bits por sufijo)
         """
         self.timeout = timeout
+        self.max_hilos = max_hilos
+        self._limitador = _LimitadorTasa(peticiones_por_segundo) if peticiones_por_segundo else None
+        
+        # Sesión y pool de hilos compartidos, creados bajo demanda
+        self._sesion = None
+        self._executor = None
+        self._lock = threading.Lock()
+        
+        # Peticiones en curso por prefijo (single-flight)
+        self._en_vuelo = {}
+        
+        # Caché LRU de rangos empaquetados por prefijo
+        if formato_rangos not in (FORMATO_COMPLETO, FORMATO_HUELLA):
+            raise ValueError(f'Formato de rango no válido: {formato_rangos}')
+        self.tamano_cache = tamano_cache
+        self.formato_rangos = formato_rangos
+        self._cache_rangos = OrderedDict()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.cerrar()
+    
+    def cerrar(self):
+        """
+        Libera el pool de hilos y las conexiones de la sesión HTTP.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            sesion, self._sesion = self._sesion, None
+        
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if sesion is not None:
+            sesion.close()
+    
+    def exportar_cache(self):
+        """
+        Devuelve una copia de la caché de rangos (por ejemplo, para guardarla en disco).
+        
+        Returns:
+            dict: Rangos empaquetados por prefijo, del menos al más usado
+        """
+        with self._lock:
+            return dict(self._cache_rangos)
+    
+    def importar_cache(self, rangos):
+        """
+        Añade rangos previamente exportados a la caché.
+        
+        Args:
+            rangos (dict): Rangos empaquetados (RangoCompacto) por prefijo
+        """
+        for prefijo, rango in rangos.items():
+            self._guardar_rango(prefijo, rango)
+    
+    def futures(self, contrasenas):
+        """
+        Lanza la verificación de varias contraseñas en el pool de hilos.
+        
+        Args:
+            contrasenas (iterable[str]): Las contraseñas a verificar
+            
+        Returns:
+            list[Future]: Un Future por contraseña, en el mismo orden, cuyo resultado
+                tiene la misma estructura que verificar_contrasena
+        """
+        executor = self._obtener_executor()
+        return [executor.submit(self.verificar_contrasena, c) for c in contrasenas]
+    
+    def verificar_muchas(self, contrasenas):
+        """
+        Verifica varias contraseñas en paralelo usando el pool de hilos.
+        
+        Args:
+            contrasenas (iterable[str]): Las contraseñas a verificar
+            
+        Returns:
+            list[dict]: Resultados en el mismo orden que la entrada
+        """
+        return [futuro.result() for futuro in self.futures(contrasenas)]
     
     def verificar_contrasena(self, contrasena):
         """
@@ -51,18 +186,21 @@ class HIBPChecker:
             prefijo = hash_completo[:5]
             sufijo = hash_completo[5:]
             
-            # Consultar la API con el prefijo
-            respuesta = self._consultar_api(prefijo)
+            # Obtener el rango del prefijo (caché o API)
+            rango = self._obtener_rango(prefijo)
             
-            if respuesta is None:
+            if rango is None:
                 return {
                     'filtrada': False,
                     'veces_vista': 0,
                     'error': 'No se pudo conectar con la API'
                 }
             
-            # Buscar el sufijo en la respuesta
-            veces_vista = self._buscar_sufijo(sufijo, respuesta)
+            # Buscar el sufijo en el rango empaquetado o, sin caché, en el texto
+            if isinstance(rango, str):
+                veces_vista = self._buscar_sufijo(sufijo, rango)
+            else:
+                veces_vista = rango.buscar(sufijo)
             
             return {
                 'filtrada': veces_vista > 0,
@@ -92,9 +230,72 @@ class HIBPChecker:
         # Retornar el hash en formato hexadecimal en mayúsculas
         return hash_objeto.hexdigest().upper()
     
+    def _obtener_rango(self, prefijo_hash):
+        """
+        Obtiene el rango de un prefijo, desde la caché o desde la API.
+        
+        Las consultas simultáneas al mismo prefijo comparten una única descarga
+        (single-flight). Si la caché está activada, el rango se empaqueta y se
+        guarda en ella; si no, se devuelve el texto de la respuesta tal cual,
+        ya que empaquetarlo para una sola búsqueda cuesta más que recorrerlo.
+        
+        Args:
+            prefijo_hash (str): Los primeros 5 caracteres del hash SHA-1
+            
+        Returns:
+            RangoCompacto | str | None: El rango empaquetado, el texto de la
+                respuesta (sin caché) o None si hay error
+        """
+        with self._lock:
+            rango = self._cache_rangos.get(prefijo_hash)
+            if rango is not None:
+                self._cache_rangos.move_to_end(prefijo_hash)
+                return rango
+            
+            futuro = self._en_vuelo.get(prefijo_hash)
+            propietario = futuro is None
+            if propietario:
+                futuro = Future()
+                self._en_vuelo[prefijo_hash] = futuro
+        
+        # Otro hilo ya está consultando este prefijo: esperar su resultado
+        if not propietario:
+            return futuro.result()
+        
+        try:
+            respuesta = self._consultar_api(prefijo_hash)
+            rango = respuesta
+            if respuesta is not None and self.tamano_cache > 0:
+                rango = RangoCompacto.desde_texto(respuesta, self.formato_rangos)
+                self._guardar_rango(prefijo_hash, rango)
+            futuro.set_result(rango)
+            return rango
+        finally:
+            with self._lock:
+                self._en_vuelo.pop(prefijo_hash, None)
+            if not futuro.done():
+                futuro.set_result(None)
+    
+    def _guardar_rango(self, prefijo_hash, rango):
+        """
+        Guarda un rango en la caché, descartando el menos usado si está llena.
+        
+        Args:
+            prefijo_hash (str): Los primeros 5 caracteres del hash SHA-1
+            rango (RangoCompacto): El rango empaquetado
+        """
+        if self.tamano_cache <= 0:
+            return
+        
+        with self._lock:
+            self._cache_rangos[prefijo_hash] = rango
+            self._cache_rangos.move_to_end(prefijo_hash)
+            while len(self._cache_rangos) > self.tamano_cache:
+                self._cache_rangos.popitem(last=False)
+    
     def _consultar_api(self, prefijo_hash):
         """
-        Consulta la API de HIBP con el prefijo del hash.
+        Consulta la API de HIBP con el prefijo del hash usando la sesión compartida.
         
         Args:
             prefijo_hash (str): Los primeros 5 caracteres del hash SHA-1
@@ -105,8 +306,11 @@ class HIBPChecker:
         try:
             url = f"{self.API_URL}{prefijo_hash}"
             
-            # Realizar la petición GET con timeout
-            response = requests.get(url, timeout=self.timeout)
+            if self._limitador is not None:
+                self._limitador.adquirir()
+            
+            # Realizar la petición GET con timeout reutilizando conexiones
+            response = self._obtener_sesion().get(url, timeout=self.timeout)
             
             # Verificar que la respuesta sea exitosa
             response.raise_for_status()
@@ -151,3 +355,36 @@ class HIBPChecker:
         
         # Si no se encuentra, la contraseña no ha sido filtrada
         return 0
+    
+    def _obtener_sesion(self):
+        """
+        Devuelve la sesión HTTP compartida, creándola si aún no existe.
+        
+        El tamaño del pool de conexiones se ajusta al número de hilos para que
+        las peticiones concurrentes reutilicen conexiones en lugar de abrir nuevas.
+        
+        Returns:
+            requests.Session: Sesión compartida entre hilos
+        """
+        with self._lock:
+            if self._sesion is None:
+                sesion = requests.Session()
+                adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, self.max_hilos))
+                sesion.mount('https://', adaptador)
+                self._sesion = sesion
+            return self._sesion
+    
+    def _obtener_executor(self):
+        """
+        Devuelve el pool de hilos compartido, creándolo si aún no existe.
+        
+        Returns:
+            ThreadPoolExecutor: Pool usado por verificar_muchas y futures
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_hilos,
+                    thread_name_prefix='hibp'
+                )
+            return self._executor
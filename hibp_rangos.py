@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""
+Almacenamiento compacto de rangos de Have I Been Pwned.
+Empaqueta las respuestas de la API en un formato binario para reducir la memoria
+de la caché de prefijos y permite buscar sufijos directamente sobre el buffer.
+"""
+
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+# Un sufijo SHA-1 tiene 35 caracteres hexadecimales (140 bits = 17.5 bytes)
+LONGITUD_SUFIJO = 35
+BITS_SUFIJO = LONGITUD_SUFIJO * 4
+
+# Dos sufijos completos caben exactamente en 35 bytes
+BYTES_PAR = BITS_SUFIJO * 2 // 8
+MASCARA_SUFIJO = (1 << BITS_SUFIJO) - 1
+
+# La huella usa los primeros 64 bits (16 caracteres hexadecimales) del sufijo
+BYTES_HUELLA = 8
+DESPLAZAMIENTO_HUELLA = BITS_SUFIJO - BYTES_HUELLA * 8
+
+# Cada cuántas entradas se guarda el offset del conteo correspondiente
+INTERVALO_SALTOS = 32
+
+FORMATO_COMPLETO = 'completo'
+FORMATO_HUELLA = 'huella'
+
+# Serialización: formato, entradas, bytes de sufijos, bytes de conteos, colisiones
+_CABECERA = struct.Struct('>BIIII')
+_COLISION = struct.Struct('>18sQ')
+_FORMATOS = (FORMATO_COMPLETO, FORMATO_HUELLA)
+
+
+def _codificar_varint(valor, destino):
+    """
+    Añade un entero no negativo codificado como varint (LEB128) al bytearray destino.
+
+    Args:
+        valor (int): El entero a codificar
+        destino (bytearray): Buffer donde se escribe el resultado
+    """
+    while valor >= 0x80:
+        destino.append((valor & 0x7F) | 0x80)
+        valor >>= 7
+    destino.append(valor)
+
+
+def _leer_varint(buffer, posicion):
+    """
+    Lee un varint del buffer a partir de la posición indicada.
+
+    Args:
+        buffer (bytes): Buffer con varints consecutivos
+        posicion (int): Offset del primer byte del varint
+
+    Returns:
+        tuple: (valor, posición del siguiente varint)
+    """
+    valor = 0
+    desplazamiento = 0
+    while True:
+        byte = buffer[posicion]
+        posicion += 1
+        valor |= (byte & 0x7F) << desplazamiento
+        if byte < 0x80:
+            return valor, posicion
+        desplazamiento += 7
+
+
+def parsear_respuesta(respuesta):
+    """
+    Convierte el texto de la API (líneas SUFIJO:CANTIDAD) en pares (entero, cantidad).
+
+    Args:
+        respuesta (str): La respuesta de la API
+
+    Returns:
+        list[tuple[int, int]]: Sufijos como enteros de 140 bits con su cantidad
+    """
+    entradas = []
+    for linea in respuesta.split('\n'):
+        if ':' in linea:
+            hash_sufijo, cantidad = linea.split(':')
+            entradas.append((int(hash_sufijo.strip(), 16), int(cantidad.strip())))
+    return entradas
+
+
+class RangoCompacto:
+    """
+    Rango de sufijos de un prefijo HIBP empaquetado en binario.
+
+    Los sufijos se guardan ordenados, ya sea completos (17.5 bytes cada uno,
+    empaquetados por pares) o reducidos a una huella de 64 bits. Las cantidades
+    se guardan como varints con una tabla de saltos para no recorrerlas enteras.
+
+    En formato huella, los sufijos del rango que comparten huella se guardan
+    completos en una tabla aparte, de modo que nunca se confunden entre sí.
+    Un sufijo ausente del rango solo puede dar un falso positivo si coincide
+    en sus primeros 64 bits con alguno presente (probabilidad ~n/2^64).
+    """
+
+    __slots__ = ('formato', 'total', 'sufijos', 'conteos', 'saltos', 'colisiones')
+
+    def __init__(self, entradas, formato=FORMATO_COMPLETO):
+        """
+        Empaqueta un rango.
+
+        Args:
+            entradas (iterable[tuple[int, int]]): Pares (sufijo como entero, cantidad)
+            formato (str): 'completo' para guardar sufijos exactos o 'huella'
+                para guardar solo sus primeros 64 bits
+
+        Raises:
+            ValueError: Si el formato no es válido
+        """
+        if formato not in (FORMATO_COMPLETO, FORMATO_HUELLA):
+            raise ValueError(f'Formato de rango no válido: {formato}')
+
+        self.formato = formato
+        self.colisiones = None
+        entradas = sorted(entradas)
+
+        if formato == FORMATO_HUELLA:
+            entradas = self._separar_colisiones(entradas)
+
+        self.total = len(entradas)
+        self.sufijos = self._empaquetar_sufijos(entradas)
+
+        # Cantidades como varints, con un offset cada INTERVALO_SALTOS entradas
+        conteos = bytearray()
+        saltos = array('I')
+        for i, (_, cantidad) in enumerate(entradas):
+            if i % INTERVALO_SALTOS == 0:
+                saltos.append(len(conteos))
+            _codificar_varint(cantidad, conteos)
+        self.conteos = bytes(conteos)
+        self.saltos = saltos
+
+    @classmethod
+    def desde_texto(cls, respuesta, formato=FORMATO_COMPLETO):
+        """
+        Construye un rango compacto a partir de la respuesta en texto de la API.
+
+        Args:
+            respuesta (str): La respuesta de la API
+            formato (str): Formato de almacenamiento ('completo' o 'huella')
+
+        Returns:
+            RangoCompacto: El rango empaquetado
+        """
+        return cls(parsear_respuesta(respuesta), formato)
+
+    def serializar(self):
+        """
+        Convierte el rango en bytes para guardarlo en disco.
+
+        Returns:
+            bytes: El rango serializado (ver deserializar)
+        """
+        colisiones = [
+            (valor, cantidad)
+            for grupo in (self.colisiones or {}).values()
+            for valor, cantidad in grupo.items()
+        ]
+        partes = [
+            _CABECERA.pack(_FORMATOS.index(self.formato), self.total,
+                           len(self.sufijos), len(self.conteos), len(colisiones)),
+            self.sufijos,
+            self.conteos
+        ]
+        partes.extend(_COLISION.pack(v.to_bytes(18, 'big'), c) for v, c in colisiones)
+        return b''.join(partes)
+
+    @classmethod
+    def deserializar(cls, datos):
+        """
+        Reconstruye un rango a partir de los bytes generados por serializar().
+
+        Args:
+            datos (bytes): El rango serializado
+
+        Returns:
+            RangoCompacto: El rango reconstruido
+        """
+        formato, total, n_sufijos, n_conteos, n_colisiones = _CABECERA.unpack_from(datos, 0)
+        posicion = _CABECERA.size
+
+        rango = cls.__new__(cls)
+        rango.formato = _FORMATOS[formato]
+        rango.total = total
+        rango.sufijos = bytes(datos[posicion:posicion + n_sufijos])
+        posicion += n_sufijos
+        rango.conteos = bytes(datos[posicion:posicion + n_conteos])
+        posicion += n_conteos
+
+        # La tabla de saltos se recalcula recorriendo los varints
+        saltos = array('I')
+        offset = 0
+        for i in range(total):
+            if i % INTERVALO_SALTOS == 0:
+                saltos.append(offset)
+            _, offset = _leer_varint(rango.conteos, offset)
+        rango.saltos = saltos
+
+        rango.colisiones = None
+        for _ in range(n_colisiones):
+            valor, cantidad = _COLISION.unpack_from(datos, posicion)
+            posicion += _COLISION.size
+            valor = int.from_bytes(valor, 'big')
+            if rango.colisiones is None:
+                rango.colisiones = {}
+            rango.colisiones.setdefault(valor >> DESPLAZAMIENTO_HUELLA, {})[valor] = cantidad
+        return rango
+
+    def buscar(self, sufijo):
+        """
+        Busca un sufijo en el rango.
+
+        Args:
+            sufijo (str): Los 35 caracteres hexadecimales del sufijo
+
+        Returns:
+            int: Número de veces que se ha visto (0 si no se encuentra)
+        """
+        valor = int(sufijo, 16)
+
+        if self.formato == FORMATO_HUELLA:
+            valor >>= DESPLAZAMIENTO_HUELLA
+            if self.colisiones is not None and valor in self.colisiones:
+                return self.colisiones[valor].get(int(sufijo, 16), 0)
+
+        indice = bisect_left(_VistaSufijos(self), valor)
+        if indice < self.total and self._sufijo(indice) == valor:
+            return self._conteo(indice)
+        return 0
+
+    def tamano_bytes(self):
+        """
+        Calcula la memoria real ocupada por el rango.
+
+        Returns:
+            int: Bytes del objeto y de sus buffers, incluidas las cabeceras de
+                los objetos de Python (medido con sys.getsizeof)
+        """
+        tamano = (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.sufijos)
+            + sys.getsizeof(self.conteos)
+            + sys.getsizeof(self.saltos)
+        )
+        if self.colisiones:
+            tamano += sys.getsizeof(self.colisiones)
+            for huella, grupo in self.colisiones.items():
+                tamano += sys.getsizeof(huella) + sys.getsizeof(grupo)
+                tamano += sum(sys.getsizeof(v) + sys.getsizeof(c) for v, c in grupo.items())
+        return tamano
+
+    def __len__(self):
+        return self.total + sum(len(g) for g in (self.colisiones or {}).values())
+
+    def _separar_colisiones(self, entradas):
+        """
+        Aparta los sufijos cuya huella de 64 bits se repite dentro del rango.
+
+        Args:
+            entradas (list[tuple[int, int]]): Pares ordenados (sufijo, cantidad)
+
+        Returns:
+            list[tuple[int, int]]: Pares (huella, cantidad) sin huellas repetidas
+        """
+        agrupadas = {}
+        for valor, cantidad in entradas:
+            agrupadas.setdefault(valor >> DESPLAZAMIENTO_HUELLA, []).append((valor, cantidad))
+
+        unicas = []
+        for huella, grupo in agrupadas.items():
+            if len(grupo) == 1:
+                unicas.append((huella, grupo[0][1]))
+            else:
+                if self.colisiones is None:
+                    self.colisiones = {}
+                self.colisiones[huella] = dict(grupo)
+        return sorted(unicas)
+
+    def _empaquetar_sufijos(self, entradas):
+        """
+        Empaqueta los sufijos ordenados en un único buffer.
+
+        Args:
+            entradas (list[tuple[int, int]]): Pares ordenados (valor, cantidad)
+
+        Returns:
+            bytes: Buffer con los sufijos empaquetados
+        """
+        if self.formato == FORMATO_HUELLA:
+            return b''.join(v.to_bytes(BYTES_HUELLA, 'big') for v, _ in entradas)
+
+        # Dos sufijos de 140 bits por cada bloque de 35 bytes
+        bloques = []
+        for i in range(0, len(entradas), 2):
+            alto = entradas[i][0]
+            bajo = entradas[i + 1][0] if i + 1 < len(entradas) else 0
+            bloques.append(((alto << BITS_SUFIJO) | bajo).to_bytes(BYTES_PAR, 'big'))
+        return b''.join(bloques)
+
+    def _sufijo(self, indice):
+        """
+        Extrae el valor del sufijo en la posición indicada.
+
+        Args:
+            indice (int): Posición en el rango ordenado
+
+        Returns:
+            int: El sufijo (o su huella) como entero
+        """
+        if self.formato == FORMATO_HUELLA:
+            inicio = indice * BYTES_HUELLA
+            return int.from_bytes(self.sufijos[inicio:inicio + BYTES_HUELLA], 'big')
+
+        inicio = (indice >> 1) * BYTES_PAR
+        par = int.from_bytes(self.sufijos[inicio:inicio + BYTES_PAR], 'big')
+        if indice & 1:
+            return par & MASCARA_SUFIJO
+        return par >> BITS_SUFIJO
+
+    def _conteo(self, indice):
+        """
+        Decodifica la cantidad asociada a la posición indicada.
+
+        Args:
+            indice (int): Posición en el rango ordenado
+
+        Returns:
+            int: Número de veces que se ha visto el sufijo
+        """
+        posicion = self.saltos[indice // INTERVALO_SALTOS]
+        for _ in range(indice % INTERVALO_SALTOS):
+            _, posicion = _leer_varint(self.conteos, posicion)
+        return _leer_varint(self.conteos, posicion)[0]
+
+
+class _VistaSufijos:
+    """
+    Vista secuencial sobre los sufijos de un RangoCompacto para usar bisect.
+    """
+
+    __slots__ = ('rango',)
+
+    def __init__(self, rango):
+        self.rango = rango
+
+    def __len__(self):
+        return self.rango.total
+
+    def __getitem__(self, indice):
+        return self.rango._sufijo(indice)
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Formatos compactos para listas de contraseñas comunes.
+Define un índice ordenado de huellas de 64 bits y un filtro de Bloom, ambos
+consultables directamente sobre el archivo mapeado en memoria (mmap).
+"""
+
+import hashlib
+import math
+import mmap
+import struct
+
+# Cabeceras: 8 bytes de firma seguidos de los parámetros del formato
+FIRMA_INDICE = b'VCIDX1\x00\x00'
+FIRMA_FILTRO = b'VCBLM1\x00\x00'
+
+CABECERA_INDICE = struct.Struct('>8sQ')      # firma, número de entradas
+CABECERA_FILTRO = struct.Struct('>8sQQI')    # firma, entradas, bits, funciones hash
+
+BYTES_HUELLA = 8
+_HUELLA = struct.Struct('>Q')
+
+
+def normalizar(linea):
+    """
+    Normaliza una entrada de la lista igual que lo hace el validador.
+
+    Args:
+        linea (str): Línea leída de la lista
+
+    Returns:
+        str: La entrada sin espacios en los extremos y en minúsculas
+    """
+    return linea.strip().lower()
+
+
+def huella(texto):
+    """
+    Calcula la huella de 64 bits de una entrada normalizada.
+
+    Args:
+        texto (str): La entrada normalizada
+
+    Returns:
+        int: Huella BLAKE2b de 64 bits
+    """
+    return int.from_bytes(hashlib.blake2b(texto.encode('utf-8'), digest_size=BYTES_HUELLA).digest(), 'big')
+
+
+def _posiciones_bloom(valor, bits, funciones):
+    """
+    Calcula las posiciones de un valor en el filtro de Bloom (doble hashing).
+
+    Args:
+        valor (int): Huella de 64 bits de la entrada
+        bits (int): Tamaño del filtro en bits
+        funciones (int): Número de funciones hash
+
+    Returns:
+        generator[int]: Posiciones de bit
+    """
+    # Se derivan dos hashes independientes a partir de la huella
+    h = hashlib.blake2b(_HUELLA.pack(valor), digest_size=16).digest()
+    h1 = int.from_bytes(h[:8], 'big')
+    h2 = int.from_bytes(h[8:], 'big') | 1
+    return ((h1 + i * h2) % bits for i in range(funciones))
+
+
+def escribir_indice(destino, huellas, total):
+    """
+    Escribe un índice a partir de huellas ya ordenadas y sin duplicados.
+
+    Args:
+        destino (file): Archivo binario abierto para escritura
+        huellas (iterable[int]): Huellas ordenadas de forma ascendente
+        total (int | None): Número de huellas, o None si no se conoce de antemano
+            (el archivo debe admitir seek para reescribir la cabecera)
+
+    Returns:
+        int: Número de huellas escritas
+    """
+    destino.write(CABECERA_INDICE.pack(FIRMA_INDICE, total or 0))
+
+    escritas = 0
+    bloque = bytearray()
+    for valor in huellas:
+        bloque += _HUELLA.pack(valor)
+        escritas += 1
+        if len(bloque) >= 1 << 20:
+            destino.write(bloque)
+            bloque.clear()
+    destino.write(bloque)
+
+    if total != escritas:
+        destino.seek(0)
+        destino.write(CABECERA_INDICE.pack(FIRMA_INDICE, escritas))
+        destino.seek(0, 2)
+    return escritas
+
+
+def escribir_filtro(destino, huellas, total, tasa_falsos_positivos=0.001):
+    """
+    Construye y escribe un filtro de Bloom dimensionado para el número de entradas.
+
+    Args:
+        destino (file): Archivo binario abierto para escritura
+        huellas (iterable[int]): Huellas de las entradas
+        total (int): Número de entradas
+        tasa_falsos_positivos (float): Probabilidad objetivo de falso positivo
+
+    Returns:
+        int: Tamaño del filtro en bits
+    """
+    total = max(1, total)
+    bits = max(8, int(math.ceil(-total * math.log(tasa_falsos_positivos) / math.log(2) ** 2)))
+    bits = (bits + 7) // 8 * 8
+    funciones = max(1, int(round(bits / total * math.log(2))))
+
+    tabla = bytearray(bits // 8)
+    for valor in huellas:
+        for posicion in _posiciones_bloom(valor, bits, funciones):
+            tabla[posicion >> 3] |= 1 << (posicion & 7)
+
+    destino.write(CABECERA_FILTRO.pack(FIRMA_FILTRO, total, bits, funciones))
+    destino.write(tabla)
+    return bits
+
+
+class _ArchivoMapeado:
+    """
+    Base para los formatos que se consultan sobre el archivo mapeado en memoria.
+    """
+
+    def __init__(self, ruta, cabecera, firma):
+        self._archivo = open(ruta, 'rb')
+        try:
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._archivo.close()
+            raise IOError(f'Archivo vacío: {ruta}')
+
+        if len(self._mapa) < cabecera.size or self._mapa[:len(firma)] != firma:
+            self.cerrar()
+            raise IOError(f'Formato de archivo no reconocido: {ruta}')
+        self._parametros = cabecera.unpack_from(self._mapa, 0)[1:]
+        self._inicio = cabecera.size
+
+    def cerrar(self):
+        """
+        Libera el mapeo y cierra el archivo.
+        """
+        self._mapa.close()
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+class IndiceContrasenas(_ArchivoMapeado):
+    """
+    Índice ordenado de huellas de 64 bits de una lista de contraseñas.
+
+    Ocupa 8 bytes por entrada y se consulta por búsqueda binaria sobre el mmap,
+    sin cargar la lista en memoria. Admite el operador `in` como un set.
+    """
+
+    def __init__(self, ruta):
+        """
+        Abre un índice.
+
+        Args:
+            ruta (str): Ruta del archivo .idx
+
+        Raises:
+            IOError: Si el archivo no es un índice válido
+        """
+        super().__init__(ruta, CABECERA_INDICE, FIRMA_INDICE)
+        self.total = self._parametros[0]
+
+    def __len__(self):
+        return self.total
+
+    def __contains__(self, texto):
+        valor = huella(texto)
+        bajo, alto = 0, self.total
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            actual = _HUELLA.unpack_from(self._mapa, self._inicio + medio * BYTES_HUELLA)[0]
+            if actual < valor:
+                bajo = medio + 1
+            elif actual > valor:
+                alto = medio
+            else:
+                return True
+        return False
+
+    def __iter__(self):
+        for i in range(self.total):
+            yield _HUELLA.unpack_from(self._mapa, self._inicio + i * BYTES_HUELLA)[0]
+
+
+class FiltroBloom(_ArchivoMapeado):
+    """
+    Filtro de Bloom de una lista de contraseñas.
+
+    Más pequeño que el índice, a cambio de una pequeña tasa de falsos positivos
+    (nunca falsos negativos). Admite el operador `in` como un set.
+    """
+
+    def __init__(self, ruta):
+        """
+        Abre un filtro.
+
+        Args:
+            ruta (str): Ruta del archivo .bloom
+
+        Raises:
+            IOError: Si el archivo no es un filtro válido
+        """
+        super().__init__(ruta, CABECERA_FILTRO, FIRMA_FILTRO)
+        self.total, self.bits, self.funciones = self._parametros
+
+    def __len__(self):
+        return self.total
+
+    def __contains__(self, texto):
+        mapa = self._mapa
+        inicio = self._inicio
+        for posicion in _posiciones_bloom(huella(texto), self.bits, self.funciones):
+            if not mapa[inicio + (posicion >> 3)] & (1 << (posicion & 7)):
+                return False
+        return True
+
+
+def es_exacta(coleccion):
+    """
+    Indica si una colección de contraseñas comunes responde sin falsos positivos.
+
+    Los conjuntos y los índices (.idx) son exactos (el índice, salvo colisiones de
+    huellas de 64 bits); los filtros de Bloom no.
+
+    Args:
+        coleccion (set | IndiceContrasenas | FiltroBloom | None): La colección
+
+    Returns:
+        bool: True si una coincidencia confirma que la contraseña está en la lista
+    """
+    return coleccion is not None and not isinstance(coleccion, FiltroBloom)
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+Herramienta de ingesta de listas de contraseñas.
+Convierte listas de palabras y volcados de filtraciones (posiblemente de varios GB)
+en el índice (.idx) y el filtro de Bloom (.bloom) que carga el validador.
+
+La entrada se lee en bloques grandes, se normaliza en un pool de procesos y se
+ordena con una ordenación externa por fusión, de modo que la memoria usada no
+depende del tamaño de la entrada.
+
+Uso:
+    python ingesta.py lista1.txt lista2.txt --indice comunes.idx --filtro comunes.bloom
+"""
+
+import argparse
+import heapq
+import os
+import sys
+import tempfile
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from indice_contrasenas import escribir_filtro, escribir_indice, huella, normalizar, IndiceContrasenas
+
+# Número máximo de archivos temporales que se fusionan a la vez
+MAX_FUSION = 64
+
+BYTES_LECTURA_RUN = 1 << 20
+
+# Longitud máxima de una línea de la entrada; las más largas se descartan
+MAX_LINEA = 1 << 16
+
+
+class _Progreso:
+    """
+    Muestra el progreso de la ingesta en stderr, como máximo dos veces por segundo.
+    """
+
+    def __init__(self, silencioso=False):
+        self.silencioso = silencioso
+        self._ultimo = 0.0
+
+    def mostrar(self, etapa, actual, total=None, forzar=False):
+        """
+        Muestra una línea de progreso.
+
+        Args:
+            etapa (str): Nombre de la etapa actual
+            actual (int): Cantidad procesada
+            total (int | None): Cantidad total, si se conoce
+            forzar (bool): Mostrar aunque no haya pasado el intervalo mínimo
+        """
+        ahora = time.monotonic()
+        if self.silencioso or (not forzar and ahora - self._ultimo < 0.5):
+            return
+        self._ultimo = ahora
+
+        if total:
+            texto = f'{etapa}: {actual:,}/{total:,} ({actual * 100 / total:.1f}%)'
+        else:
+            texto = f'{etapa}: {actual:,}'
+        sys.stderr.write(f'\r{texto:<70}')
+        if forzar:
+            sys.stderr.write('\n')
+        sys.stderr.flush()
+
+
+def leer_bloques(rutas, tamano_bloque):
+    """
+    Lee los archivos en bloques grandes que terminan siempre en fin de línea.
+
+    Se aceptan como fin de línea '\n', '\r\n' y '\r'. Una línea de más de
+    MAX_LINEA bytes (por ejemplo, en un archivo binario) se descarta entera,
+    para que la memoria usada no dependa de la entrada.
+
+    Args:
+        rutas (list[str]): Archivos de entrada
+        tamano_bloque (int): Tamaño aproximado de cada bloque en bytes
+
+    Returns:
+        generator[bytes]: Bloques de líneas completas
+    """
+    for ruta in rutas:
+        with open(ruta, 'rb', buffering=tamano_bloque) as archivo:
+            resto = b''
+            descartando = False
+            tras_cr = False
+            while True:
+                datos = archivo.read(tamano_bloque)
+                if not datos:
+                    break
+                # Un '\r\n' partido entre dos bloques ya se cortó en el '\r'
+                if tras_cr and datos.startswith(b'\n'):
+                    datos = datos[1:]
+                tras_cr = datos.endswith(b'\r')
+                if not datos:
+                    continue
+
+                corte = max(datos.rfind(b'\n'), datos.rfind(b'\r')) + 1
+                if corte == 0:
+                    # El bloque entero es parte de una misma línea
+                    if not descartando:
+                        resto += datos
+                        if len(resto) > MAX_LINEA:
+                            resto, descartando = b'', True
+                    continue
+
+                if descartando:
+                    # Saltar el final de la línea demasiado larga
+                    inicio = _primer_fin_de_linea(datos) + 1
+                    bloque = datos[inicio:corte]
+                    descartando = False
+                else:
+                    bloque = resto + datos[:corte]
+                resto = datos[corte:]
+                if len(resto) > MAX_LINEA:
+                    resto, descartando = b'', True
+                if bloque:
+                    yield bloque
+            if resto and not descartando:
+                yield resto
+
+
+def _primer_fin_de_linea(datos):
+    """
+    Devuelve la posición del primer '\n' o '\r' de datos (que debe contener alguno).
+    """
+    posiciones = [p for p in (datos.find(b'\n'), datos.find(b'\r')) if p >= 0]
+    return min(posiciones)
+
+
+def procesar_bloque(bloque):
+    """
+    Normaliza un bloque de líneas y devuelve sus huellas ordenadas y sin duplicados.
+
+    Se ejecuta en los procesos del pool. Las líneas que no son UTF-8 válido se
+    descartan, ya que nunca pueden coincidir con una contraseña introducida.
+
+    Args:
+        bloque (bytes): Bloque de líneas completas
+
+    Returns:
+        tuple: (huellas como bytes de un array('Q'), líneas leídas, tamaño del bloque)
+    """
+    huellas = set()
+    lineas = bloque.splitlines()
+    for linea in lineas:
+        try:
+            texto = normalizar(linea.decode('utf-8'))
+        except UnicodeDecodeError:
+            continue
+        if texto:
+            huellas.add(huella(texto))
+    return array('Q', sorted(huellas)).tobytes(), len(lineas), len(bloque)
+
+
+def _sin_duplicados(valores):
+    """
+    Elimina los duplicados consecutivos de una secuencia ordenada.
+    """
+    anterior = None
+    for valor in valores:
+        if valor != anterior:
+            yield valor
+            anterior = valor
+
+
+def _leer_run(ruta):
+    """
+    Lee un archivo temporal de huellas ordenadas en bloques grandes.
+    """
+    with open(ruta, 'rb') as archivo:
+        while True:
+            datos = archivo.read(BYTES_LECTURA_RUN)
+            if not datos:
+                break
+            yield from array('Q', datos)
+
+
+def _escribir_run(ruta, valores):
+    """
+    Escribe huellas ordenadas en un archivo temporal.
+
+    Returns:
+        int: Número de huellas escritas
+    """
+    escritas = 0
+    bloque = array('Q')
+    with open(ruta, 'wb') as archivo:
+        for valor in valores:
+            bloque.append(valor)
+            if len(bloque) * bloque.itemsize >= BYTES_LECTURA_RUN:
+                archivo.write(bloque.tobytes())
+                escritas += len(bloque)
+                bloque = array('Q')
+        archivo.write(bloque.tobytes())
+        escritas += len(bloque)
+    return escritas
+
+
+class _OrdenacionExterna:
+    """
+    Acumula huellas ordenadas por bloques y las vuelca a archivos temporales
+    cuando se supera el límite de memoria; al final las fusiona por grupos.
+    """
+
+    def __init__(self, directorio, entradas_por_run):
+        self.directorio = directorio
+        self.entradas_por_run = entradas_por_run
+        self.runs = []
+        self._creados = 0
+        self._pendientes = []
+        self._entradas = 0
+
+    def agregar(self, huellas):
+        """
+        Añade un bloque de huellas ordenadas.
+
+        Args:
+            huellas (array): Huellas ordenadas y sin duplicados
+        """
+        self._pendientes.append(huellas)
+        self._entradas += len(huellas)
+        if self._entradas >= self.entradas_por_run:
+            self._volcar()
+
+    def fusionar(self, progreso):
+        """
+        Fusiona todos los datos en una única secuencia ordenada y sin duplicados.
+
+        Returns:
+            generator[int]: Huellas ordenadas
+        """
+        self._volcar()
+        while len(self.runs) > MAX_FUSION:
+            grupo, self.runs = self.runs[:MAX_FUSION], self.runs[MAX_FUSION:]
+            progreso.mostrar('Fusionando archivos temporales', len(self.runs), forzar=True)
+            self.runs.append(self._nuevo_run(_sin_duplicados(heapq.merge(*map(_leer_run, grupo)))))
+            for ruta in grupo:
+                os.remove(ruta)
+        return _sin_duplicados(heapq.merge(*map(_leer_run, self.runs)))
+
+    def _volcar(self):
+        if not self._pendientes:
+            return
+        self.runs.append(self._nuevo_run(_sin_duplicados(heapq.merge(*self._pendientes))))
+        self._pendientes = []
+        self._entradas = 0
+
+    def _nuevo_run(self, valores):
+        ruta = os.path.join(self.directorio, f'run_{self._creados:06d}.bin')
+        self._creados += 1
+        _escribir_run(ruta, valores)
+        return ruta
+
+
+def ingerir(rutas, ruta_indice, ruta_filtro=None, tasa_falsos_positivos=0.001,
+            procesos=None, tamano_bloque=16 << 20, entradas_por_run=4_000_000,
+            directorio_temporal=None, silencioso=False):
+    """
+    Construye el índice (y opcionalmente el filtro de Bloom) a partir de listas de texto.
+
+    Args:
+        rutas (list[str]): Archivos de entrada, una contraseña por línea
+        ruta_indice (str): Archivo .idx de salida
+        ruta_filtro (str | None): Archivo .bloom de salida (None para no generarlo)
+        tasa_falsos_positivos (float): Tasa objetivo de falsos positivos del filtro
+        procesos (int | None): Procesos del pool (None para usar todos los núcleos)
+        tamano_bloque (int): Bytes de entrada por bloque enviado a cada proceso
+        entradas_por_run (int): Huellas acumuladas en memoria antes de volcar a disco
+        directorio_temporal (str | None): Directorio para los archivos temporales
+        silencioso (bool): No mostrar el progreso
+
+    Returns:
+        dict: Estadísticas con las claves 'lineas' y 'entradas'
+    """
+    progreso = _Progreso(silencioso)
+    total_bytes = sum(os.path.getsize(ruta) for ruta in rutas)
+    procesos = procesos or os.cpu_count() or 1
+    leidos = 0
+    lineas = 0
+
+    with tempfile.TemporaryDirectory(dir=directorio_temporal) as directorio:
+        ordenacion = _OrdenacionExterna(directorio, entradas_por_run)
+
+        def recoger(futuro):
+            nonlocal leidos, lineas
+            datos, lineas_bloque, bytes_bloque = futuro.result()
+            ordenacion.agregar(array('Q', datos))
+            lineas += lineas_bloque
+            leidos += bytes_bloque
+            progreso.mostrar('Leyendo', leidos, total_bytes)
+
+        # Se limita el número de bloques en vuelo para acotar la memoria
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            en_vuelo = deque()
+            for bloque in leer_bloques(rutas, tamano_bloque):
+                en_vuelo.append(pool.submit(procesar_bloque, bloque))
+                if len(en_vuelo) >= procesos * 2:
+                    recoger(en_vuelo.popleft())
+            while en_vuelo:
+                recoger(en_vuelo.popleft())
+        progreso.mostrar('Leyendo', leidos, total_bytes, forzar=True)
+
+        with open(ruta_indice, 'wb') as destino:
+            entradas = escribir_indice(destino, ordenacion.fusionar(progreso), None)
+        progreso.mostrar('Entradas únicas en el índice', entradas, forzar=True)
+
+    if ruta_filtro:
+        with IndiceContrasenas(ruta_indice) as indice, open(ruta_filtro, 'wb') as destino:
+            bits = escribir_filtro(destino, indice, entradas, tasa_falsos_positivos)
+        progreso.mostrar('Bits del filtro de Bloom', bits, forzar=True)
+
+    return {
+        'lineas': lineas,
+        'entradas': entradas
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Construye el índice y el filtro de contraseñas comunes que carga el validador.'
+    )
+    parser.add_argument('entradas', nargs='+', help='listas de texto, una contraseña por línea')
+    parser.add_argument('--indice', required=True, help='archivo .idx de salida')
+    parser.add_argument('--filtro', help='archivo .bloom de salida (opcional)')
+    parser.add_argument('--falsos-positivos', type=float, default=0.001,
+                        help='tasa objetivo de falsos positivos del filtro (por defecto 0.001)')
+    parser.add_argument('--procesos', type=int, help='procesos del pool (por defecto, todos los núcleos)')
+    parser.add_argument('--tamano-bloque', type=int, default=16,
+                        help='MB de entrada por bloque (por defecto 16)')
+    parser.add_argument('--entradas-por-run', type=int, default=4_000_000,
+                        help='huellas en memoria antes de volcar a disco (por defecto 4000000)')
+    parser.add_argument('--temporal', help='directorio para los archivos temporales')
+    parser.add_argument('--silencioso', action='store_true', help='no mostrar el progreso')
+    args = parser.parse_args()
+
+    estadisticas = ingerir(
+        args.entradas, args.indice, args.filtro,
+        tasa_falsos_positivos=args.falsos_positivos,
+        procesos=args.procesos,
+        tamano_bloque=args.tamano_bloque << 20,
+        entradas_por_run=args.entradas_por_run,
+        directorio_temporal=args.temporal,
+        silencioso=args.silencioso
+    )
+    print(f'{estadisticas["lineas"]:,} líneas leídas, {estadisticas["entradas"]:,} entradas únicas')
+
+
+if __name__ == '__main__':
+    main()
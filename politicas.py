@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+"""
+Políticas de puntuación de contraseñas.
+Define las políticas de forma declarativa (JSON/YAML) y las compila una sola vez
+en tablas de consulta, de modo que puntuar un análisis es indexar tablas.
+"""
+
+import copy
+import json
+import os
+from bisect import bisect_left
+
+# Umbral a partir del cual los tramos se consultan con bisect en lugar de con
+# una tabla de una posición por valor
+MAX_TABLA = 4096
+
+# Política por defecto: reproduce los umbrales y puntos documentados en el README.
+# Cada lista de "tramos" se recorre en orden; un tramo aplica a los valores menores
+# o iguales que su "hasta" y el último tramo (sin "hasta") cubre el resto.
+POLITICA_POR_DEFECTO = {
+    'nombre': 'por_defecto',
+    'longitud': {
+        'tramos': [
+            {'hasta': 7, 'puntos': 0, 'cumple': False},
+            {'hasta': 10, 'puntos': 10, 'cumple': True},
+            {'hasta': 12, 'puntos': 15, 'cumple': True},
+            {'hasta': 15, 'puntos': 20, 'cumple': True},
+            {'puntos': 25, 'cumple': True}
+        ]
+    },
+    'complejidad': {
+        'tramos': [
+            {'hasta': 0, 'puntos': 0, 'cumple': False},
+            {'hasta': 1, 'puntos': 5, 'cumple': False},
+            {'hasta': 2, 'puntos': 15, 'cumple': False},
+            {'hasta': 3, 'puntos': 25, 'cumple': True},
+            {'puntos': 30, 'cumple': True}
+        ]
+    },
+    'patrones': {
+        'tramos': [
+            {'hasta': 0, 'puntos': 20, 'cumple': True},
+            {'hasta': 1, 'puntos': 10, 'cumple': False},
+            {'puntos': 0, 'cumple': False}
+        ]
+    },
+    'comun': {
+        'puntos': 15,
+        'nivel': 'Muy Débil'
+    },
+    'filtrada': {
+        'puntos': 10,
+        'niveles': [
+            {'hasta': 99, 'nivel': 'Comprometida'},
+            {'nivel': 'Muy Comprometida'}
+        ]
+    },
+    'niveles': [
+        {'hasta': 30, 'nivel': 'Muy Débil'},
+        {'hasta': 50, 'nivel': 'Débil'},
+        {'hasta': 70, 'nivel': 'Aceptable'},
+        {'hasta': 85, 'nivel': 'Fuerte'},
+        {'nivel': 'Muy Fuerte'}
+    ],
+    'sugerencias': {
+        'longitud_minima': 8,
+        'longitud_recomendada': 12
+    }
+}
+
+
+def _compilar_tramos(tramos, seccion, valor):
+    """
+    Compila una lista de tramos en una función de consulta.
+
+    Si el último "hasta" es pequeño (longitud, tipos de caracteres, patrones,
+    puntuación), se precalcula una tabla con una posición por cada valor entero
+    desde 0 hasta el último "hasta" más uno; los valores mayores usan la última
+    posición. Si no (por ejemplo, las veces que se ha visto una contraseña
+    filtrada, que llegan a millones), se busca con bisect en la tupla de umbrales.
+
+    Args:
+        tramos (list[dict]): Tramos de la política
+        seccion (str): Nombre de la sección (para los mensajes de error)
+        valor (callable): Función que convierte un tramo en el valor de la tabla
+
+    Returns:
+        callable: Función int -> valor precalculado
+
+    Raises:
+        ValueError: Si los tramos no son válidos
+    """
+    if not tramos:
+        raise ValueError(f'La sección "{seccion}" no tiene tramos')
+    if 'hasta' in tramos[-1]:
+        raise ValueError(f'El último tramo de "{seccion}" no debe tener "hasta"')
+
+    limites = []
+    for tramo in tramos[:-1]:
+        if 'hasta' not in tramo:
+            raise ValueError(f'Solo el último tramo de "{seccion}" puede omitir "hasta"')
+        try:
+            hasta = int(tramo['hasta'])
+        except (TypeError, ValueError):
+            raise ValueError(f'"hasta" no válido en "{seccion}": {tramo["hasta"]!r}')
+        if hasta < 0 or (limites and hasta <= limites[-1]):
+            raise ValueError(f'Los tramos de "{seccion}" deben tener "hasta" creciente y no negativo')
+        limites.append(hasta)
+
+    limites = tuple(limites)
+    try:
+        valores = tuple(valor(tramo) for tramo in tramos)
+    except KeyError as e:
+        raise ValueError(f'Falta la clave {e} en un tramo de "{seccion}"')
+    except (TypeError, ValueError) as e:
+        raise ValueError(f'Tramo no válido en "{seccion}": {e}')
+
+    if limites and limites[-1] >= MAX_TABLA:
+        def consultar_umbrales(entrada):
+            return valores[bisect_left(limites, entrada)]
+
+        return consultar_umbrales
+
+    tabla = []
+    for hasta, resultado in zip(limites, valores):
+        tabla.extend([resultado] * (hasta + 1 - len(tabla)))
+    tabla.append(valores[-1])
+
+    tabla = tuple(tabla)
+    tope = len(tabla) - 1
+
+    def consultar(entrada):
+        if entrada >= tope:
+            return tabla[tope]
+        return tabla[entrada if entrada > 0 else 0]
+
+    return consultar
+
+
+def _claves_tramos(tramos):
+    return {clave for tramo in tramos for clave in tramo}
+
+
+def _comprobar_claves(configuracion):
+    """
+    Comprueba que la configuración solo usa secciones y claves de POLITICA_POR_DEFECTO,
+    incluidas las claves de cada tramo, para que una errata no pase desapercibida.
+
+    Args:
+        configuracion (dict): Configuración de la política tal como se ha cargado
+
+    Raises:
+        ValueError: Si alguna sección o clave no existe
+    """
+    if not isinstance(configuracion, dict):
+        raise ValueError('La configuración de una política debe ser un objeto')
+
+    for seccion, valor in configuracion.items():
+        if seccion not in POLITICA_POR_DEFECTO:
+            raise ValueError(f'Sección desconocida: "{seccion}"')
+        por_defecto = POLITICA_POR_DEFECTO[seccion]
+        if isinstance(por_defecto, (dict, list)) and not isinstance(valor, type(por_defecto)):
+            tipo = 'un objeto' if isinstance(por_defecto, dict) else 'una lista'
+            raise ValueError(f'La sección "{seccion}" debe ser {tipo}')
+
+        # Listas de tramos de la sección: (nombre, configurada, por defecto)
+        if isinstance(por_defecto, list):
+            listas = [(seccion, valor, por_defecto)]
+        elif isinstance(por_defecto, dict):
+            for clave in valor:
+                if clave not in por_defecto:
+                    raise ValueError(f'Clave desconocida en "{seccion}": "{clave}"')
+            listas = [
+                (f'{seccion}.{clave}', valor[clave], por_defecto[clave])
+                for clave in valor if isinstance(por_defecto[clave], list)
+            ]
+        else:
+            continue
+
+        for nombre, tramos, tramos_por_defecto in listas:
+            if not isinstance(tramos, list):
+                continue
+            permitidas = _claves_tramos(tramos_por_defecto)
+            for tramo in tramos:
+                desconocidas = set(tramo) - permitidas if isinstance(tramo, dict) else ()
+                if desconocidas:
+                    raise ValueError(f'Clave desconocida en un tramo de "{nombre}": '
+                                     f'"{sorted(desconocidas)[0]}"')
+
+
+def _entero(config, seccion, clave):
+    valor = config[seccion][clave]
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f'"{seccion}.{clave}" debe ser un entero: {valor!r}')
+
+
+def _puntos_y_cumple(tramo):
+    return int(tramo['puntos']), bool(tramo['cumple'])
+
+
+def _nivel(tramo):
+    return str(tramo['nivel'])
+
+
+class Politica:
+    """
+    Política de puntuación compilada.
+
+    Se construye a partir de una configuración declarativa; las secciones que
+    falten, y las claves que falten dentro de cada sección, se toman de
+    POLITICA_POR_DEFECTO. Las listas (tramos y niveles) se reemplazan enteras.
+    Las secciones y claves que no existen en POLITICA_POR_DEFECTO se rechazan.
+    Una misma política compilada puede evaluar cualquier número de análisis sin
+    volver a interpretar la configuración.
+    """
+
+    def __init__(self, configuracion=None):
+        """
+        Compila una política.
+
+        Args:
+            configuracion (dict | None): Configuración de la política
+                (None para la política por defecto)
+
+        Raises:
+            ValueError: Si la configuración no es válida o usa secciones o claves
+                que no existen en POLITICA_POR_DEFECTO
+        """
+        configuracion = configuracion or {}
+        try:
+            _comprobar_claves(configuracion)
+        except ValueError as e:
+            nombre = POLITICA_POR_DEFECTO['nombre']
+            if isinstance(configuracion, dict):
+                nombre = configuracion.get('nombre', nombre)
+            raise ValueError(f'Configuración de política "{nombre}" no válida: {e}')
+
+        config = copy.deepcopy(POLITICA_POR_DEFECTO)
+        for seccion, valor in copy.deepcopy(configuracion).items():
+            # Las secciones con claves se fusionan clave a clave; las listas se reemplazan
+            if isinstance(valor, dict) and isinstance(config.get(seccion), dict):
+                config[seccion].update(valor)
+            else:
+                config[seccion] = valor
+        self.configuracion = config
+        self.nombre = str(config['nombre'])
+
+        try:
+            self._longitud = _compilar_tramos(config['longitud']['tramos'], 'longitud', _puntos_y_cumple)
+            self._complejidad = _compilar_tramos(config['complejidad']['tramos'], 'complejidad', _puntos_y_cumple)
+            self._patrones = _compilar_tramos(config['patrones']['tramos'], 'patrones', _puntos_y_cumple)
+            self._nivel_puntuacion = _compilar_tramos(config['niveles'], 'niveles', _nivel)
+            self._nivel_filtrada = _compilar_tramos(config['filtrada']['niveles'], 'filtrada', _nivel)
+
+            self.puntos_no_comun = _entero(config, 'comun', 'puntos')
+            self.nivel_comun = str(config['comun']['nivel'])
+            self.puntos_no_filtrada = _entero(config, 'filtrada', 'puntos')
+            self.longitud_minima = _entero(config, 'sugerencias', 'longitud_minima')
+            self.longitud_recomendada = _entero(config, 'sugerencias', 'longitud_recomendada')
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f'Configuración de política "{self.nombre}" no válida: {e}')
+
+    def evaluar_longitud(self, longitud):
+        """
+        Evalúa la longitud de la contraseña.
+
+        Args:
+            longitud (int): Número de caracteres
+
+        Returns:
+            dict: Información sobre la longitud y puntos asignados
+        """
+        puntos, cumple = self._longitud(longitud)
+        return {
+            'valor': longitud,
+            'cumple': cumple,
+            'puntos': puntos
+        }
+
+    def evaluar_complejidad(self, mayusculas, minusculas, numeros, especiales):
+        """
+        Evalúa la complejidad a partir de los tipos de caracteres presentes.
+
+        Args:
+            mayusculas (bool): Si contiene mayúsculas
+            minusculas (bool): Si contiene minúsculas
+            numeros (bool): Si contiene números
+            especiales (bool): Si contiene caracteres especiales
+
+        Returns:
+            dict: Información sobre los tipos de caracteres y puntos asignados
+        """
+        tipos_usados = mayusculas + minusculas + numeros + especiales
+        puntos, cumple = self._complejidad(tipos_usados)
+        return {
+            'mayusculas': mayusculas,
+            'minusculas': minusculas,
+            'numeros': numeros,
+            'especiales': especiales,
+            'tipos_usados': tipos_usados,
+            'cumple': cumple,
+            'puntos': puntos
+        }
+
+    def evaluar_patrones(self, secuencias_numericas, secuencias_alfabeticas, repeticiones):
+        """
+        Evalúa los patrones detectados.
+
+        Args:
+            secuencias_numericas (bool): Si hay secuencias numéricas
+            secuencias_alfabeticas (bool): Si hay secuencias alfabéticas
+            repeticiones (bool): Si hay repeticiones de caracteres
+
+        Returns:
+            dict: Información sobre los patrones detectados y puntos asignados
+        """
+        puntos, cumple = self._patrones(secuencias_numericas + secuencias_alfabeticas + repeticiones)
+        return {
+            'secuencias_numericas': secuencias_numericas,
+            'secuencias_alfabeticas': secuencias_alfabeticas,
+            'repeticiones': repeticiones,
+            'cumple': cumple,
+            'puntos': puntos
+        }
+
+    def criterios(self, analisis):
+        """
+        Construye los criterios evaluados a partir de un análisis de la contraseña.
+
+        Args:
+            analisis (dict): Resultado de ValidadorContrasena._analizar
+
+        Returns:
+            dict: Criterios con la misma estructura que ValidadorContrasena.validar
+        """
+        return {
+            'longitud': self.evaluar_longitud(analisis['longitud']),
+            'complejidad': self.evaluar_complejidad(
+                analisis['mayusculas'], analisis['minusculas'],
+                analisis['numeros'], analisis['especiales']
+            ),
+            'patrones': self.evaluar_patrones(
+                analisis['secuencias_numericas'], analisis['secuencias_alfabeticas'],
+                analisis['repeticiones']
+            ),
+            'comun': analisis['comun'],
+            'filtrada': analisis['filtrada']
+        }
+
+    def calcular_puntuacion(self, criterios):
+        """
+        Calcula la puntuación total.
+
+        Args:
+            criterios (dict): Diccionario con todos los criterios evaluados
+
+        Returns:
+            int: Puntuación total
+        """
+        puntuacion = (
+            criterios['longitud']['puntos']
+            + criterios['complejidad']['puntos']
+            + criterios['patrones']['puntos']
+        )
+        if not criterios['comun']:
+            puntuacion += self.puntos_no_comun
+        if not criterios['filtrada']['filtrada']:
+            puntuacion += self.puntos_no_filtrada
+        return puntuacion
+
+    def determinar_nivel(self, puntuacion, criterios):
+        """
+        Determina el nivel de seguridad.
+
+        Args:
+            puntuacion (int): Puntuación total
+            criterios (dict): Diccionario con todos los criterios evaluados
+
+        Returns:
+            str: Nivel de seguridad
+        """
+        # Casos especiales que anulan la puntuación
+        if criterios['filtrada']['filtrada']:
+            return self._nivel_filtrada(criterios['filtrada']['veces_vista'])
+        if criterios['comun']:
+            return self.nivel_comun
+        return self._nivel_puntuacion(puntuacion)
+
+
+def cargar_politica(ruta):
+    """
+    Carga una o varias políticas desde un archivo JSON o YAML.
+
+    El archivo puede contener una sola política (un objeto) o una lista de políticas.
+    Los archivos .yaml/.yml requieren PyYAML.
+
+    Args:
+        ruta (str): Ruta del archivo
+
+    Returns:
+        Politica | list[Politica]: La política o políticas compiladas
+
+    Raises:
+        FileNotFoundError: Si el archivo no existe
+        ImportError: Si el archivo es YAML y PyYAML no está instalado
+        ValueError: Si alguna política no es válida
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+
+    with open(ruta, 'r', encoding='utf-8') as archivo:
+        if extension in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError('Se necesita PyYAML para cargar políticas YAML: pip install pyyaml')
+            datos = yaml.safe_load(archivo)
+        else:
+            datos = json.load(archivo)
+
+    if isinstance(datos, list):
+        return [Politica(config) for config in datos]
+    return Politica(datos)
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de los fragmentos y la reanudación de auditoria.py.
+"""
+
+import json
+
+import pytest
+
+from auditoria import (
+    Auditoria, AuditoriaInterrumpida, dividir_en_fragmentos, elegir_politica,
+    fusionar_checkpoints
+)
+
+CONTENIDO = (
+    b'alfa\nbeta\r\n\ngamma\n' + b'\xff\xfe\n'
+    + b''.join(b'clave%d\n' % i for i in range(40))
+    + b'una linea bastante mas larga que el bloque de lectura\nomega'
+)
+LINEAS = ['alfa', 'beta', 'gamma'] + [f'clave{i}' for i in range(40)] + [
+    'una linea bastante mas larga que el bloque de lectura', 'omega'
+]
+
+
+class _Checker:
+    tamano_cache = 0
+
+
+class _Validador:
+    """
+    Validador mínimo: registra las contraseñas y falla a partir de cierta línea.
+    """
+
+    def __init__(self, fallar_en=None):
+        self.hibp_checker = _Checker()
+        self.contrasenas_comunes = set()
+        self.fallar_en = fallar_en
+
+    def validar(self, contrasena):
+        error = 'sin conexión' if contrasena == self.fallar_en else None
+        return {'contrasena': contrasena, 'criterios': {'filtrada': {'error': error}}}
+
+
+class _Lineas:
+    """
+    Agregado que conserva las contraseñas en orden, para comprobar cuáles se procesan.
+    """
+
+    def __init__(self, lineas=None):
+        self.lineas = lineas or []
+
+    def agregar(self, resultado, contrasena=None, lista_comunes=None):
+        self.lineas.append(contrasena)
+
+    def fusionar(self, otro):
+        self.lineas.extend(otro.lineas)
+
+    def a_dict(self):
+        return {'lineas': list(self.lineas)}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        return cls(list(datos['lineas']))
+
+
+@pytest.fixture
+def entrada(tmp_path):
+    ruta = tmp_path / 'entrada.txt'
+    ruta.write_bytes(CONTENIDO)
+    return str(ruta)
+
+
+def _auditoria(entrada, checkpoint=None, inicio=0, fin=None, validador=None, **parametros):
+    return Auditoria(validador or _Validador(), entrada, checkpoint, inicio, fin,
+                     tamano_bloque=16, reintentos=0, espera_reintento=0,
+                     clase_resumen=_Lineas, **parametros)
+
+
+@pytest.mark.parametrize('fragmentos', [1, 2, 3, 7, len(CONTENIDO)])
+def test_fragmentos_procesan_cada_linea_una_vez(entrada, fragmentos):
+    procesadas = []
+    invalidas = 0
+    for inicio, fin in dividir_en_fragmentos(entrada, fragmentos):
+        auditoria = _auditoria(entrada, inicio=inicio, fin=fin)
+        procesadas.extend(auditoria.ejecutar().lineas)
+        invalidas += auditoria.invalidas
+
+    assert procesadas == LINEAS
+    assert invalidas == 1
+
+
+def test_fragmentos_cubren_el_archivo(entrada):
+    rangos = dividir_en_fragmentos(entrada, 4)
+
+    assert rangos[0][0] == 0
+    assert rangos[-1][1] == len(CONTENIDO)
+    assert all(fin == siguiente for (_, fin), (siguiente, _) in zip(rangos, rangos[1:]))
+
+
+def test_reanudar_desde_el_offset_del_checkpoint(entrada, tmp_path):
+    checkpoint = str(tmp_path / 'auditoria.json')
+
+    auditoria = _auditoria(entrada, checkpoint, validador=_Validador(fallar_en='clave7'),
+                           cada_lineas=5)
+    with pytest.raises(AuditoriaInterrumpida):
+        auditoria.ejecutar()
+
+    with open(checkpoint, encoding='utf-8') as origen:
+        estado = json.load(origen)
+    assert estado['offset'] == CONTENIDO.index(b'clave7\n')
+    assert not estado['completada']
+    assert estado['resumen']['lineas'] == LINEAS[:LINEAS.index('clave7')]
+
+    reanudada = _auditoria(entrada, checkpoint, cada_lineas=5)
+    assert reanudada.ejecutar().lineas == LINEAS
+    assert reanudada.lineas == len(LINEAS)
+
+
+def test_reanudar_fragmento(entrada, tmp_path):
+    inicio, fin = dividir_en_fragmentos(entrada, 2)[1]
+    checkpoint = str(tmp_path / 'frag1.json')
+
+    with pytest.raises(AuditoriaInterrumpida):
+        _auditoria(entrada, checkpoint, inicio, fin, validador=_Validador(fallar_en='clave30')).ejecutar()
+    procesadas = _auditoria(entrada, checkpoint, inicio, fin).ejecutar().lineas
+
+    esperadas = _auditoria(entrada, inicio=inicio, fin=fin).ejecutar().lineas
+    assert procesadas == esperadas
+    assert 'clave30' in procesadas
+
+    # El punto de control no sirve para otro fragmento
+    with pytest.raises(ValueError):
+        _auditoria(entrada, checkpoint, 0, inicio)
+
+
+def test_fusionar_checkpoints_exige_fragmentos_contiguos(entrada, tmp_path):
+    rutas = []
+    for i, (inicio, fin) in enumerate(dividir_en_fragmentos(entrada, 3)):
+        rutas.append(str(tmp_path / f'frag{i}.json'))
+        _auditoria(entrada, rutas[-1], inicio, fin).ejecutar()
+
+    assert fusionar_checkpoints(rutas[::-1], _Lineas).lineas.count('omega') == 1
+    for incorrectas in (rutas[:2], rutas + rutas[1:2], [rutas[0], rutas[2]]):
+        with pytest.raises(ValueError):
+            fusionar_checkpoints(incorrectas, _Lineas)
+
+
+def test_fusionar_fragmentos_de_rutas_distintas(tmp_path):
+    # El mismo volcado copiado en dos máquinas (rutas distintas)
+    rutas = []
+    for i, (inicio, fin) in enumerate([(0, 40), (40, len(CONTENIDO))]):
+        maquina = tmp_path / f'm{i}'
+        maquina.mkdir()
+        (maquina / 'volcado.txt').write_bytes(CONTENIDO)
+        rutas.append(str(maquina / 'frag.json'))
+        _auditoria(str(maquina / 'volcado.txt'), rutas[-1], inicio, fin).ejecutar()
+
+    assert sorted(fusionar_checkpoints(rutas, _Lineas).lineas) == sorted(LINEAS)
+
+    # Mismo tamaño pero distinto contenido: no se puede fusionar
+    otro = tmp_path / 'otro.txt'
+    otro.write_bytes(CONTENIDO.replace(b'alfa', b'ALFA'))
+    ruta_otro = str(tmp_path / 'otro.json')
+    _auditoria(str(otro), ruta_otro, 40, len(CONTENIDO)).ejecutar()
+    with pytest.raises(ValueError):
+        fusionar_checkpoints([rutas[0], ruta_otro], _Lineas)
+
+
+def test_checkpoint_de_un_archivo_modificado(entrada, tmp_path):
+    checkpoint = str(tmp_path / 'auditoria.json')
+    with pytest.raises(AuditoriaInterrumpida):
+        _auditoria(entrada, checkpoint, validador=_Validador(fallar_en='clave7')).ejecutar()
+
+    with open(entrada, 'r+b') as archivo:
+        archivo.write(b'ALFA')
+    with pytest.raises(ValueError):
+        _auditoria(entrada, checkpoint)
+
+
+def test_numero_de_fragmentos_no_valido(entrada):
+    with pytest.raises(ValueError):
+        dividir_en_fragmentos(entrada, 0)
+
+
+def test_elegir_politica_de_un_archivo_con_varias(tmp_path):
+    ruta = tmp_path / 'politicas.json'
+    ruta.write_text(json.dumps([{'nombre': 'a'}, {'nombre': 'b'}]), encoding='utf-8')
+
+    assert elegir_politica(str(ruta), 'b').nombre == 'b'
+    with pytest.raises(ValueError):
+        elegir_politica(str(ruta))
+    with pytest.raises(ValueError):
+        elegir_politica(str(ruta), 'c')
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la caché de resultados de ValidadorContrasena.
+"""
+
+import pytest
+
+import cache_resultados
+from politicas import Politica
+from validator import ValidadorContrasena
+
+
+class _Reloj:
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def monotonic(self):
+        return self.ahora
+
+
+class _HIBP:
+    """
+    Cliente HIBP falso que cuenta las consultas y puede devolver un error.
+    """
+
+    def __init__(self, veces_vista=0, error=None):
+        self.veces_vista = veces_vista
+        self.error = error
+        self.consultas = 0
+
+    def verificar_contrasena(self, contrasena):
+        self.consultas += 1
+        return {'filtrada': self.veces_vista > 0, 'veces_vista': self.veces_vista, 'error': self.error}
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = _Reloj()
+    monkeypatch.setattr(cache_resultados, 'time', reloj)
+    return reloj
+
+
+@pytest.fixture
+def validador(reloj):
+    validador = ValidadorContrasena(tamano_cache=8, ttl_hibp=60)
+    validador.hibp_checker = _HIBP()
+    validador.contrasenas_comunes = {'password'}
+    return validador
+
+
+def test_acierto_completo(validador):
+    primero = validador.validar('Tr0mp3ta!Azul')
+    primero['sugerencias'].append('modificado por el llamador')
+    segundo = validador.validar('Tr0mp3ta!Azul')
+
+    assert validador.hibp_checker.consultas == 1
+    assert 'modificado por el llamador' not in segundo['sugerencias']
+    assert validador.estadisticas_cache() == {
+        'aciertos': 1, 'aciertos_parciales': 0, 'fallos': 1,
+        'tasa_aciertos': 0.5, 'tamano': 1, 'tamano_maximo': 8
+    }
+
+
+def test_acierto_parcial_tras_caducar_hibp(validador, reloj):
+    validador.validar('Tr0mp3ta!Azul')
+    reloj.ahora += 61
+    validador.hibp_checker.veces_vista = 500
+
+    resultado = validador.validar('Tr0mp3ta!Azul')
+
+    # Solo se vuelve a consultar HIBP y el resultado se recalcula con la nueva respuesta
+    assert validador.hibp_checker.consultas == 2
+    assert resultado['criterios']['filtrada']['veces_vista'] == 500
+    assert resultado['nivel'] == 'Muy Comprometida'
+    assert validador.estadisticas_cache()['aciertos_parciales'] == 1
+
+    # La respuesta nueva vuelve a estar vigente durante ttl_hibp
+    validador.validar('Tr0mp3ta!Azul')
+    assert validador.hibp_checker.consultas == 2
+
+
+def test_error_de_hibp_se_guarda_caducado(validador):
+    validador.hibp_checker.error = 'No se pudo conectar con la API'
+    validador.validar('Tr0mp3ta!Azul')
+
+    validador.hibp_checker.error = None
+    resultado = validador.validar('Tr0mp3ta!Azul')
+
+    assert validador.hibp_checker.consultas == 2
+    assert resultado['criterios']['filtrada']['error'] is None
+    assert validador.estadisticas_cache()['aciertos_parciales'] == 1
+
+
+@pytest.mark.parametrize('atributo, valor', [
+    ('contrasenas_comunes', {'tr0mp3ta!azul'}),
+    ('politica', Politica({'nombre': 'otra', 'comun': {'puntos': 0}})),
+    ('hibp_checker', _HIBP(veces_vista=3)),
+])
+def test_asignar_configuracion_invalida_la_cache(validador, atributo, valor):
+    validador.validar('Tr0mp3ta!Azul')
+    setattr(validador, atributo, valor)
+
+    validador.validar('Tr0mp3ta!Azul')
+
+    estadisticas = validador.estadisticas_cache()
+    assert estadisticas['fallos'] == 2
+    assert estadisticas['aciertos'] == 0
+
+
+def test_lru_acotada(validador):
+    for i in range(20):
+        validador.validar(f'clave{i}')
+
+    assert validador.estadisticas_cache()['tamano'] == 8
+    validador.validar('clave0')
+    assert validador.estadisticas_cache()['fallos'] == 21
+
+
+def test_claves_sin_texto_plano():
+    cache = cache_resultados.CacheResultados()
+    clave = cache.clave('Tr0mp3ta!Azul')
+
+    assert len(clave) == 32
+    assert b'Tr0mp3ta' not in clave
+    assert cache.clave('Tr0mp3ta!Azul') == clave
+
+
+def test_sin_cache(reloj):
+    validador = ValidadorContrasena()
+    validador.hibp_checker = _HIBP()
+
+    validador.validar('Tr0mp3ta!Azul')
+    validador.validar('Tr0mp3ta!Azul')
+
+    assert validador.hibp_checker.consultas == 2
+    assert validador.estadisticas_cache() is None
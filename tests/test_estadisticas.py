@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la fusión de t-digest, count-min sketch y agregadores.
+"""
+
+import json
+import os
+import random
+
+import pytest
+
+from estadisticas import AgregadorEstadisticas, ElementosFrecuentes, TDigest
+from indice_contrasenas import FiltroBloom, escribir_filtro, huella
+from utils import cargar_contrasenas_comunes
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _rango_relativo(valores, estimacion):
+    # Fracción de valores menores o iguales que la estimación
+    return sum(v <= estimacion for v in valores) / len(valores)
+
+
+def test_tdigest_fusionado_estima_cuantiles():
+    aleatorio = random.Random(1)
+    valores = [aleatorio.lognormvariate(3, 2) for _ in range(20000)]
+
+    partes = [TDigest() for _ in range(4)]
+    for i, valor in enumerate(valores):
+        partes[i % 4].agregar(valor)
+    digest = TDigest()
+    for parte in partes:
+        digest.fusionar(TDigest.desde_dict(json.loads(json.dumps(parte.a_dict()))))
+
+    assert digest.total == len(valores)
+    assert digest.minimo == min(valores)
+    assert digest.maximo == max(valores)
+    # El error de rango se reduce hacia las colas (función de escala k2)
+    for q in (0.5, 0.9, 0.99, 0.999):
+        tolerancia = 0.02 * min(q, 1 - q) + 0.0005
+        assert _rango_relativo(valores, digest.cuantil(q)) == pytest.approx(q, abs=tolerancia)
+    assert len(digest.a_dict()['centroides']) < 200
+
+
+def test_tdigest_vacio():
+    digest = TDigest()
+    digest.fusionar(TDigest())
+
+    assert digest.total == 0
+    assert digest.cuantil(0.5) is None
+
+
+def test_count_min_fusionado_suma_los_conteos():
+    conteos = {f'clave{i}': 1 + (1000 // (i + 1)) for i in range(300)}
+    a, b = ElementosFrecuentes(k=5, ancho=256), ElementosFrecuentes(k=5, ancho=256)
+    for i, (elemento, cantidad) in enumerate(conteos.items()):
+        destino = a if i % 2 else b
+        for _ in range(cantidad):
+            destino.agregar(elemento)
+
+    filas_a = [fila.tolist() for fila in a._filas]
+    filas_b = [fila.tolist() for fila in b._filas]
+    a.fusionar(ElementosFrecuentes.desde_dict(json.loads(json.dumps(b.a_dict()))))
+
+    for fila, fila_a, fila_b in zip(a._filas, filas_a, filas_b):
+        assert fila.tolist() == [x + y for x, y in zip(fila_a, fila_b)]
+    for elemento, cantidad in conteos.items():
+        assert a.estimar(elemento) >= cantidad
+    assert [e for e, _ in a.principales()] == ['clave0', 'clave1', 'clave2', 'clave3', 'clave4']
+
+
+def test_count_min_dimensiones_distintas():
+    with pytest.raises(ValueError):
+        ElementosFrecuentes(ancho=128).fusionar(ElementosFrecuentes(ancho=256))
+
+
+def _resultado(comun, veces_vista=0):
+    return {
+        'nivel': 'Muy Débil' if comun else 'Fuerte',
+        'puntuacion': 20 if comun else 80,
+        'criterios': {
+            'complejidad': {'mayusculas': False, 'minusculas': True, 'numeros': True,
+                            'especiales': False, 'tipos_usados': 2},
+            'patrones': {'secuencias_numericas': True, 'secuencias_alfabeticas': False,
+                         'repeticiones': False},
+            'comun': comun,
+            'filtrada': {'filtrada': veces_vista > 0, 'veces_vista': veces_vista, 'error': None}
+        }
+    }
+
+
+def test_agregadores_fusionados():
+    a, b = AgregadorEstadisticas(k=3), AgregadorEstadisticas(k=3)
+    for i in range(100):
+        a.agregar(_resultado(True, 10), 'Password', {'password'})
+        b.agregar(_resultado(i % 2 == 0, i), f'otra{i % 4}', {'otra0', 'otra2'})
+
+    a.fusionar(AgregadorEstadisticas.desde_dict(json.loads(json.dumps(b.a_dict()))))
+    informe = a.informe()
+
+    assert informe['total'] == 200
+    assert informe['comunes'] == 150
+    assert informe['filtradas'] == 199
+    assert informe['niveles'] == {'Muy Débil': 150, 'Fuerte': 50}
+    assert informe['patrones']['secuencias_numericas'] == 200
+    assert informe['comunes_frecuentes'][0] == ('password', 100)
+
+
+@pytest.fixture
+def filtro_bloom(tmp_path):
+    ruta = tmp_path / 'comunes.bloom'
+    with open(ruta, 'wb') as destino:
+        escribir_filtro(destino, [huella('falsopositivo')], 1)
+    filtro = FiltroBloom(str(ruta))
+    yield filtro
+    filtro.cerrar()
+
+
+@pytest.mark.parametrize('con_filtro', [False, True])
+def test_top_de_comunes_sin_texto_si_la_lista_no_es_exacta(con_filtro, request):
+    lista = request.getfixturevalue('filtro_bloom') if con_filtro else None
+    agregador = AgregadorEstadisticas(k=3)
+    for _ in range(10):
+        agregador.agregar(_resultado(True), 'FalsoPositivo', lista)
+
+    guardado = json.dumps(agregador.a_dict())
+    (elemento, cantidad), = agregador.informe()['comunes_frecuentes']
+
+    assert 'falsopositivo' not in guardado.lower()
+    assert elemento == f'huella:{huella("falsopositivo"):016x}'
+    assert cantidad == 10
+
+
+def test_top_de_comunes_con_la_lista_por_defecto():
+    lista = cargar_contrasenas_comunes(os.path.join(RAIZ, 'resources', 'passwords_common.txt'))
+    agregador = AgregadorEstadisticas(k=3)
+    for contrasena in ['Password', 'password', '123456']:
+        agregador.agregar(_resultado(True), contrasena, lista)
+
+    assert agregador.informe()['comunes_frecuentes'] == [('password', 2), ('123456', 1)]
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del pool de hilos, el single-flight y el limitador de tasa de HIBPChecker.
+Usan una sesión HTTP falsa, así que no acceden a la red.
+"""
+
+import hashlib
+import threading
+import time
+
+import pytest
+
+from hibp_api import HIBPChecker, _LimitadorTasa
+from hibp_rangos import RangoCompacto
+
+
+def _sha1(texto):
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest().upper()
+
+
+class _Respuesta:
+    def __init__(self, texto):
+        self.text = texto
+
+    def raise_for_status(self):
+        pass
+
+
+class _Sesion:
+    """
+    Sesión falsa: responde con los hashes conocidos del prefijo pedido y cuenta las peticiones.
+    """
+
+    def __init__(self, conocidas=(), espera=0.0, error=None, liberar=None):
+        self.rangos = {}
+        for contrasena, veces in conocidas:
+            h = _sha1(contrasena)
+            self.rangos.setdefault(h[:5], []).append(f'{h[5:]}:{veces}')
+        self.espera = espera
+        self.error = error
+        self.liberar = liberar
+        self.peticiones = []
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=None):
+        with self._lock:
+            self.peticiones.append(url[-5:])
+        if self.liberar is not None:
+            self.liberar.wait(5)
+        time.sleep(self.espera)
+        if self.error is not None:
+            raise self.error
+        return _Respuesta('\r\n'.join(self.rangos.get(url[-5:], ['0' * 35 + ':1'])))
+
+    def close(self):
+        pass
+
+
+def _checker(sesion, **opciones):
+    checker = HIBPChecker(**opciones)
+    checker._sesion = sesion
+    return checker
+
+
+@pytest.mark.parametrize('tamano_cache', [0, 16])
+def test_single_flight_una_descarga_por_prefijo(tamano_cache):
+    sesion = _Sesion([('password', 42)], espera=0.2)
+    with _checker(sesion, max_hilos=32, tamano_cache=tamano_cache) as checker:
+        resultados = checker.verificar_muchas(['password'] * 32)
+
+    assert len(sesion.peticiones) == 1
+    assert all(r == {'filtrada': True, 'veces_vista': 42, 'error': None} for r in resultados)
+
+
+def test_cache_de_rangos_evita_descargas():
+    sesion = _Sesion([('password', 7)])
+    with _checker(sesion, tamano_cache=16, formato_rangos='huella') as checker:
+        checker.verificar_contrasena('password')
+        assert checker.verificar_contrasena('password')['veces_vista'] == 7
+        assert isinstance(checker.exportar_cache()[_sha1('password')[:5]], RangoCompacto)
+
+    assert len(sesion.peticiones) == 1
+
+
+def test_verificar_muchas_conserva_el_orden():
+    contrasenas = [f'clave{i}' for i in range(40)]
+    sesion = _Sesion([(c, i + 1) for i, c in enumerate(contrasenas) if i % 3 == 0])
+    with _checker(sesion, max_hilos=8) as checker:
+        resultados = checker.verificar_muchas(contrasenas)
+
+    assert [r['veces_vista'] for r in resultados] == [i + 1 if i % 3 == 0 else 0 for i in range(40)]
+
+
+def test_error_del_propietario_no_bloquea_a_los_que_esperan():
+    liberar = threading.Event()
+    sesion = _Sesion(error=RuntimeError('conexión rota'), liberar=liberar)
+    with _checker(sesion, max_hilos=8) as checker:
+        futuros = checker.futures(['password'] * 8)
+        # Dar tiempo a que los demás hilos se pongan a esperar la descarga en curso
+        time.sleep(0.2)
+        liberar.set()
+        resultados = [futuro.result(timeout=5) for futuro in futuros]
+
+    assert len(sesion.peticiones) == 1
+    assert all(not r['filtrada'] and r['error'] for r in resultados)
+    assert sum('conexión rota' in r['error'] for r in resultados) == 1
+    assert not checker._en_vuelo
+
+
+def test_limitador_de_tasa_global():
+    sesion = _Sesion()
+    with _checker(sesion, max_hilos=8, peticiones_por_segundo=10) as checker:
+        inicio = time.monotonic()
+        checker.verificar_muchas([f'clave{i}' for i in range(20)])
+        duracion = time.monotonic() - inicio
+
+    # Ráfaga inicial de 10 peticiones y las otras 10 a 10 por segundo
+    assert len(sesion.peticiones) == 20
+    assert 0.9 <= duracion < 2.5
+
+
+def test_limitador_no_supera_la_tasa():
+    limitador = _LimitadorTasa(50)
+    inicio = time.monotonic()
+    hilos = [threading.Thread(target=limitador.adquirir) for _ in range(100)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert time.monotonic() - inicio >= 0.9
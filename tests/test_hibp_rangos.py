@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del almacenamiento compacto de rangos HIBP.
+"""
+
+import hashlib
+
+import pytest
+
+from hibp_rangos import (
+    DESPLAZAMIENTO_HUELLA, FORMATO_COMPLETO, FORMATO_HUELLA, INTERVALO_SALTOS,
+    RangoCompacto
+)
+
+
+def _sufijo(valor):
+    return f'{valor:035X}'
+
+
+def _entradas(n):
+    # Sufijos pseudoaleatorios con cantidades de 1 a varios bytes de varint
+    return [
+        (int(hashlib.sha1(str(i).encode()).hexdigest()[:35], 16), (i * 7919) % 5000000 + 1)
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize('formato', [FORMATO_COMPLETO, FORMATO_HUELLA])
+@pytest.mark.parametrize('n', [0, 1, 2, 3, INTERVALO_SALTOS, INTERVALO_SALTOS * 3 + 1])
+def test_empaquetado_encuentra_todos_los_sufijos(formato, n):
+    entradas = _entradas(n)
+    rango = RangoCompacto(entradas, formato)
+
+    assert len(rango) == n
+    for valor, cantidad in entradas:
+        assert rango.buscar(_sufijo(valor)) == cantidad
+    assert rango.buscar(_sufijo(12345)) == 0
+
+
+def test_pares_completos_conservan_los_140_bits():
+    # Los extremos del rango de 140 bits ocupan un par entero de 35 bytes
+    maximo = (1 << 140) - 1
+    rango = RangoCompacto([(maximo, 3), (0, 1), (maximo - 1, 2)], FORMATO_COMPLETO)
+
+    assert len(rango.sufijos) == 2 * 35
+    assert rango.buscar(_sufijo(0)) == 1
+    assert rango.buscar(_sufijo(maximo - 1)) == 2
+    assert rango.buscar(_sufijo(maximo)) == 3
+    assert rango.buscar(_sufijo(1)) == 0
+
+
+def test_desde_texto_acepta_respuesta_de_la_api():
+    texto = '\r\n'.join(f'{_sufijo(v)}:{c}' for v, c in _entradas(10))
+    rango = RangoCompacto.desde_texto(texto, FORMATO_HUELLA)
+
+    for valor, cantidad in _entradas(10):
+        assert rango.buscar(_sufijo(valor).lower()) == cantidad
+
+
+def test_huellas_repetidas_van_a_la_tabla_de_colisiones():
+    huella = 0xDEADBEEFCAFEF00D << DESPLAZAMIENTO_HUELLA
+    entradas = [(huella | 1, 10), (huella | 2, 20)] + _entradas(40)
+    rango = RangoCompacto(entradas, FORMATO_HUELLA)
+
+    assert rango.colisiones == {huella >> DESPLAZAMIENTO_HUELLA: {huella | 1: 10, huella | 2: 20}}
+    assert rango.total == 40
+    assert len(rango) == 42
+    assert rango.buscar(_sufijo(huella | 1)) == 10
+    assert rango.buscar(_sufijo(huella | 2)) == 20
+    # Misma huella pero ausente del rango: no se confunde con las que colisionan
+    assert rango.buscar(_sufijo(huella | 3)) == 0
+
+
+@pytest.mark.parametrize('formato', [FORMATO_COMPLETO, FORMATO_HUELLA])
+def test_serializar_y_deserializar(formato):
+    huella = 0x0123456789ABCDEF << DESPLAZAMIENTO_HUELLA
+    entradas = [(huella | 5, 50), (huella | 6, 60)] + _entradas(INTERVALO_SALTOS * 2 + 5)
+    rango = RangoCompacto(entradas, formato)
+
+    datos = rango.serializar()
+    copia = RangoCompacto.deserializar(memoryview(b'prefijo' + datos)[len(b'prefijo'):])
+
+    assert copia.formato == formato
+    assert copia.serializar() == datos
+    assert list(copia.saltos) == list(rango.saltos)
+    assert copia.colisiones == rango.colisiones
+    for valor, cantidad in entradas:
+        assert copia.buscar(_sufijo(valor)) == cantidad
+
+
+def test_formato_no_valido():
+    with pytest.raises(ValueError):
+        RangoCompacto([], 'comprimido')
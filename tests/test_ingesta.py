@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la ingesta de listas de contraseñas y de los formatos .idx y .bloom.
+"""
+
+import pytest
+
+import ingesta
+from indice_contrasenas import FiltroBloom, IndiceContrasenas, huella
+from utils import cargar_contrasenas_comunes
+
+PALABRAS = [f'Clave{i}' for i in range(3000)]
+
+
+@pytest.fixture
+def listas(tmp_path):
+    # Tres listas con duplicados entre ellas y finales de línea distintos
+    rutas = []
+    contenidos = [
+        b'\n'.join(p.encode() for p in PALABRAS[:1500]) + b'\n  CLAVE7  \n\n',
+        b'\r\n'.join(p.upper().encode() for p in PALABRAS[1000:2500]) + b'\r\n\xff\xfe\r\n',
+        b'\r'.join(p.lower().encode() for p in PALABRAS[2000:]),
+    ]
+    for i, contenido in enumerate(contenidos):
+        ruta = tmp_path / f'lista{i}.txt'
+        ruta.write_bytes(contenido)
+        rutas.append(str(ruta))
+    return rutas
+
+
+@pytest.fixture
+def indice_y_filtro(listas, tmp_path, monkeypatch):
+    # Runs pequeños y fusiones de 3 en 3 para forzar varias pasadas de fusión
+    monkeypatch.setattr(ingesta, 'MAX_FUSION', 3)
+    ruta_indice = str(tmp_path / 'comunes.idx')
+    ruta_filtro = str(tmp_path / 'comunes.bloom')
+    estadisticas = ingesta.ingerir(listas, ruta_indice, ruta_filtro, procesos=2,
+                                   tamano_bloque=512, entradas_por_run=100,
+                                   directorio_temporal=str(tmp_path), silencioso=True)
+    return estadisticas, ruta_indice, ruta_filtro
+
+
+def test_ingerir_genera_indice_ordenado_y_sin_duplicados(indice_y_filtro):
+    estadisticas, ruta_indice, _ = indice_y_filtro
+    esperadas = sorted(huella(p.lower()) for p in PALABRAS)
+
+    assert estadisticas['entradas'] == len(PALABRAS)
+    assert estadisticas['lineas'] == (1500 + 2) + (1500 + 1) + 1000
+    with IndiceContrasenas(ruta_indice) as indice:
+        assert len(indice) == len(PALABRAS)
+        assert list(indice) == esperadas
+
+
+def test_pertenencia_al_indice(indice_y_filtro):
+    _, ruta_indice, _ = indice_y_filtro
+    with IndiceContrasenas(ruta_indice) as indice:
+        assert all(p.lower() in indice for p in PALABRAS)
+        assert not any(f'otra{i}' in indice for i in range(3000))
+
+
+def test_pertenencia_al_filtro_de_bloom(indice_y_filtro):
+    _, _, ruta_filtro = indice_y_filtro
+    with FiltroBloom(ruta_filtro) as filtro:
+        assert len(filtro) == len(PALABRAS)
+        # Sin falsos negativos
+        assert all(p.lower() in filtro for p in PALABRAS)
+        # Tasa objetivo de 0.1%: con 20000 consultas se esperan unos 20 falsos positivos
+        falsos_positivos = sum(f'otra{i}' in filtro for i in range(20000))
+        assert falsos_positivos < 60
+
+
+def test_cargar_contrasenas_comunes_por_extension(indice_y_filtro, listas):
+    _, ruta_indice, ruta_filtro = indice_y_filtro
+
+    indice = cargar_contrasenas_comunes(ruta_indice)
+    filtro = cargar_contrasenas_comunes(ruta_filtro)
+    texto = cargar_contrasenas_comunes(listas[0])
+    try:
+        assert isinstance(indice, IndiceContrasenas)
+        assert isinstance(filtro, FiltroBloom)
+        assert isinstance(texto, set)
+        assert 'clave7' in indice and 'clave7' in filtro and 'clave7' in texto
+    finally:
+        indice.cerrar()
+        filtro.cerrar()
+
+    with pytest.raises(IOError):
+        cargar_contrasenas_comunes(listas[0][:-4] + '.idx')
+
+
+def _lineas(ruta, tamano_bloque):
+    return [linea for bloque in ingesta.leer_bloques([ruta], tamano_bloque)
+            for linea in bloque.splitlines()]
+
+
+@pytest.mark.parametrize('tamano_bloque', [5, 8, 64])
+def test_leer_bloques_con_finales_de_linea_mixtos(tmp_path, tamano_bloque):
+    ruta = tmp_path / 'mixto.txt'
+    ruta.write_bytes(b'uno\r\ndos\rtres\ncuatro\r\n\r\ncinco')
+
+    assert _lineas(str(ruta), tamano_bloque) == [b'uno', b'dos', b'tres', b'cuatro', b'', b'cinco']
+
+
+def test_leer_bloques_descarta_lineas_demasiado_largas(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingesta, 'MAX_LINEA', 100)
+    ruta = tmp_path / 'binario.txt'
+    ruta.write_bytes(b'antes\n' + b'x' * 1000 + b'\ndespues\n' + b'y' * 1000)
+
+    bloques = list(ingesta.leer_bloques([str(ruta)], 16))
+
+    assert [l for b in bloques for l in b.splitlines()] == [b'antes', b'despues']
+    assert max(len(b) for b in bloques) <= 16 + 100
+
+
+def test_leer_bloques_acota_los_archivos_solo_con_retorno_de_carro(tmp_path):
+    ruta = tmp_path / 'mac.txt'
+    ruta.write_bytes(b'\r'.join(b'clave%d' % i for i in range(5000)))
+
+    bloques = list(ingesta.leer_bloques([str(ruta)], 256))
+
+    assert len(bloques) > 100
+    assert max(len(b) for b in bloques) <= 256 + 16
+    assert [l for b in bloques for l in b.splitlines()] == [b'clave%d' % i for i in range(5000)]
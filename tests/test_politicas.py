@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de las políticas de puntuación y de ValidadorContrasena.validar_politicas.
+"""
+
+import json
+
+import pytest
+
+from politicas import MAX_TABLA, Politica, cargar_politica
+from validator import ValidadorContrasena
+
+
+def _puntos_originales(longitud, tipos, patrones, comun, veces_vista):
+    """
+    Puntuación y nivel de la escala if/elif anterior a las políticas configurables.
+    """
+    if longitud < 8:
+        puntos = 0
+    elif longitud <= 10:
+        puntos = 10
+    elif longitud <= 12:
+        puntos = 15
+    elif longitud <= 15:
+        puntos = 20
+    else:
+        puntos = 25
+    puntos += {1: 5, 2: 15, 3: 25}.get(tipos, 30)
+    puntos += {0: 20, 1: 10}.get(patrones, 0)
+    puntos += 0 if comun else 15
+    puntos += 0 if veces_vista else 10
+
+    if veces_vista:
+        nivel = 'Muy Comprometida' if veces_vista >= 100 else 'Comprometida'
+    elif comun:
+        nivel = 'Muy Débil'
+    elif puntos <= 30:
+        nivel = 'Muy Débil'
+    elif puntos <= 50:
+        nivel = 'Débil'
+    elif puntos <= 70:
+        nivel = 'Aceptable'
+    elif puntos <= 85:
+        nivel = 'Fuerte'
+    else:
+        nivel = 'Muy Fuerte'
+    return puntos, nivel
+
+
+def _criterios(politica, longitud, tipos, patrones, comun, veces_vista):
+    clases = [i < tipos for i in range(4)]
+    flags = [i < patrones for i in range(3)]
+    return politica.criterios({
+        'longitud': longitud,
+        'mayusculas': clases[0], 'minusculas': clases[1],
+        'numeros': clases[2], 'especiales': clases[3],
+        'secuencias_numericas': flags[0], 'secuencias_alfabeticas': flags[1],
+        'repeticiones': flags[2],
+        'comun': comun,
+        'filtrada': {'filtrada': veces_vista > 0, 'veces_vista': veces_vista, 'error': None}
+    })
+
+
+def test_politica_por_defecto_reproduce_la_escala_original():
+    politica = Politica()
+    for longitud in range(0, 40):
+        for tipos in range(1, 5):
+            for patrones in range(4):
+                for comun in (False, True):
+                    for veces_vista in (0, 1, 99, 100, 10 ** 7):
+                        criterios = _criterios(politica, longitud, tipos, patrones, comun, veces_vista)
+                        obtenido = politica.calcular_puntuacion(criterios)
+                        obtenido = obtenido, politica.determinar_nivel(obtenido, criterios)
+                        assert obtenido == _puntos_originales(longitud, tipos, patrones, comun, veces_vista)
+
+
+def test_sin_tipos_de_caracteres_no_suma_puntos_de_complejidad():
+    # Cambio intencionado: la escala original daba 30 puntos (como con 4 tipos)
+    complejidad = Politica().evaluar_complejidad(False, False, False, False)
+
+    assert complejidad['tipos_usados'] == 0
+    assert complejidad['puntos'] == 0
+    assert not complejidad['cumple']
+
+
+def test_tramos_grandes_usan_bisect():
+    politica = Politica({'filtrada': {'niveles': [
+        {'hasta': 10 ** 9, 'nivel': 'Algo'},
+        {'hasta': 10 ** 12, 'nivel': 'Mucho'},
+        {'nivel': 'Muchísimo'}
+    ]}})
+
+    assert MAX_TABLA <= 10 ** 9
+    assert [politica._nivel_filtrada(v) for v in (1, 10 ** 9, 10 ** 9 + 1, 10 ** 12, 10 ** 12 + 1)] == [
+        'Algo', 'Algo', 'Mucho', 'Mucho', 'Muchísimo'
+    ]
+
+
+@pytest.mark.parametrize('hasta', [MAX_TABLA - 1, MAX_TABLA])
+def test_tabla_y_bisect_coinciden_en_el_limite(hasta):
+    politica = Politica({'niveles': [{'hasta': hasta, 'nivel': 'bajo'}, {'nivel': 'alto'}]})
+
+    assert [politica._nivel_puntuacion(v) for v in (-5, 0, hasta, hasta + 1, 10 * hasta)] == [
+        'bajo', 'bajo', 'bajo', 'alto', 'alto'
+    ]
+
+
+def test_fusion_clave_a_clave():
+    politica = Politica({'nombre': 'parcial', 'comun': {'puntos': 5}})
+
+    assert politica.puntos_no_comun == 5
+    assert politica.nivel_comun == 'Muy Débil'
+    assert politica.puntos_no_filtrada == 10
+
+
+@pytest.mark.parametrize('configuracion', [
+    {'longitu': {}},
+    {'comun': {'puntoz': 0}},
+    {'niveles': [{'hasta': 10, 'nivl': 'x'}, {'nivel': 'y'}]},
+    {'comun': 5},
+    {'longitud': {'tramos': [{'hasta': 'x', 'puntos': 1, 'cumple': True}, {'puntos': 2, 'cumple': True}]}},
+    {'niveles': [{'hasta': 10, 'nivel': 'x'}, {'hasta': 10, 'nivel': 'y'}, {'nivel': 'z'}]},
+    {'niveles': [{'hasta': 10, 'nivel': 'x'}]},
+])
+def test_configuracion_no_valida(configuracion):
+    with pytest.raises(ValueError, match='"por_defecto" no válida'):
+        Politica(configuracion)
+
+
+def test_cargar_varias_politicas(tmp_path):
+    ruta = tmp_path / 'politicas.json'
+    ruta.write_text(json.dumps([{'nombre': 'a'}, {'nombre': 'b', 'comun': {'puntos': 0}}]),
+                    encoding='utf-8')
+
+    assert [p.nombre for p in cargar_politica(str(ruta))] == ['a', 'b']
+
+
+class _HIBP:
+    def verificar_contrasena(self, contrasena):
+        return {'filtrada': False, 'veces_vista': 0, 'error': None}
+
+
+@pytest.fixture
+def validador():
+    validador = ValidadorContrasena()
+    validador.hibp_checker = _HIBP()
+    validador.contrasenas_comunes = {'password'}
+    return validador
+
+
+def test_validar_politicas(validador):
+    estricta = Politica({'nombre': 'estricta', 'niveles': [
+        {'hasta': 100, 'nivel': 'Insuficiente'}, {'nivel': 'Suficiente'}
+    ]})
+    resultados = validador.validar_politicas('Tr0mp3ta!Azul', [Politica(), estricta])
+
+    assert list(resultados) == ['por_defecto', 'estricta']
+    assert resultados['por_defecto'] == validador.validar('Tr0mp3ta!Azul')
+    assert resultados['estricta']['puntuacion'] == resultados['por_defecto']['puntuacion']
+    assert resultados['estricta']['nivel'] == 'Insuficiente'
+
+
+def test_validar_politicas_con_nombres_duplicados(validador):
+    with pytest.raises(ValueError, match='duplicados: por_defecto'):
+        validador.validar_politicas('Tr0mp3ta!Azul', [Politica(), Politica({'comun': {'puntos': 0}})])
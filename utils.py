@@ -7,6 +7,8 @@ Contiene funciones auxiliares para detectar tipos de caracteres y patrones comun
 import re
 import os
 
+from indice_contrasenas import FiltroBloom, IndiceContrasenas
+
 
 def tiene_mayusculas(texto):
     """
@@ -136,20 +138,36 @@ def detectar_repeticiones(texto):
     return False
 
 
-def cargar_contrasenas_comunes():
+def cargar_contrasenas_comunes(ruta_archivo=None):
     """
-    Carga la lista de contraseñas comunes desde el archivo resources/passwords_common.txt.
+    Carga la lista de contraseñas comunes.
+    
+    Por defecto lee resources/passwords_common.txt. También admite los formatos
+    compactos generados por ingesta.py: un índice (.idx) o un filtro de Bloom (.bloom),
+    que se consultan sobre el archivo mapeado en memoria sin cargarlo entero.
+    
+    Args:
+        ruta_archivo (str | None): Ruta de la lista (None para la lista por defecto)
     
     Returns:
-        set: Conjunto de contraseñas comunes (en minúsculas para comparación case-insensitive)
+        set | IndiceContrasenas | FiltroBloom: Colección de contraseñas comunes
+            (en minúsculas para comparación case-insensitive) que admite el operador `in`
         
     Raises:
         FileNotFoundError: Si el archivo no existe
         IOError: Si hay un error al leer el archivo
     """
-    ruta_archivo = os.path.join('resources', 'passwords_common.txt')
+    if ruta_archivo is None:
+        ruta_archivo = os.path.join('resources', 'passwords_common.txt')
+    
+    extension = os.path.splitext(ruta_archivo)[1].lower()
     
     try:
+        if extension == '.idx':
+            return IndiceContrasenas(ruta_archivo)
+        if extension == '.bloom':
+            return FiltroBloom(ruta_archivo)
+        
         with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
             # Leer todas las líneas, eliminar espacios en blanco y convertir a minúsculas
             contrasenas = {linea.strip().lower() for linea in archivo if linea.strip()}
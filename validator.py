@@ -4,7 +4,9 @@ Módulo principal de validación de contraseñas.
 Coordina todas las validaciones y calcula la puntuación final de seguridad.
 """
 
+from cache_resultados import CacheResultados
 from hibp_api import HIBPChecker
+from politicas import Politica
 import utils
 
 
@@ -13,20 +15,97 @@ class ValidadorContrasena:
     Coordina todas las validaciones de contraseña y calcula la puntuación final.
     """
     
-    def __init__(self):
+    def __init__(self, tamano_cache=0, ttl_hibp=3600, politica=None, ruta_contrasenas_comunes=None):
         """
         Inicializa el validador de contraseñas.
+        
+        Args:
+            tamano_cache (int): Número máximo de resultados memorizados
+                (0 para desactivar la caché de resultados)
+            ttl_hibp (float): Segundos durante los que se reutiliza el resultado
+                de HIBP de un resultado memorizado
+            politica (Politica | dict | None): Política de puntuación, ya compilada
+                o como configuración (None para la política por defecto)
+            ruta_contrasenas_comunes (str | None): Lista de contraseñas comunes en
+                texto, índice (.idx) o filtro (.bloom); None para la lista por defecto
         """
+        self._cache = CacheResultados(tamano_cache, ttl_hibp) if tamano_cache > 0 else None
         self.hibp_checker = HIBPChecker()
-        self.contrasenas_comunes = None
+        self._contrasenas_comunes = set()
+        self.politica = politica
         
         # Intentar cargar la lista de contraseñas comunes
         try:
-            self.contrasenas_comunes = utils.cargar_contrasenas_comunes()
+            self.contrasenas_comunes = utils.cargar_contrasenas_comunes(ruta_contrasenas_comunes)
         except (FileNotFoundError, IOError):
             # Si no se puede cargar, continuar sin esta validación
             self.contrasenas_comunes = set()
     
+    @property
+    def contrasenas_comunes(self):
+        """
+        Conjunto de contraseñas comunes (en minúsculas).
+        
+        Asignar un nuevo conjunto invalida la caché de resultados. Si se modifica
+        el conjunto existente en el sitio, hay que llamar a invalidar_cache().
+        """
+        return self._contrasenas_comunes
+    
+    @contrasenas_comunes.setter
+    def contrasenas_comunes(self, contrasenas):
+        self._contrasenas_comunes = contrasenas
+        self.invalidar_cache()
+    
+    @property
+    def hibp_checker(self):
+        """
+        Cliente de HIBP usado para comprobar si la contraseña está filtrada.
+        
+        Asignar un nuevo cliente invalida la caché de resultados.
+        """
+        return self._hibp_checker
+    
+    @hibp_checker.setter
+    def hibp_checker(self, checker):
+        self._hibp_checker = checker
+        self.invalidar_cache()
+    
+    @property
+    def politica(self):
+        """
+        Política de puntuación compilada usada por validar().
+        
+        Asignar una nueva política invalida la caché de resultados.
+        """
+        return self._politica
+    
+    @politica.setter
+    def politica(self, politica):
+        if not isinstance(politica, Politica):
+            politica = Politica(politica)
+        self._politica = politica
+        self.invalidar_cache()
+    
+    def invalidar_cache(self):
+        """
+        Descarta todos los resultados memorizados.
+        Debe llamarse al cambiar la configuración que afecta a la puntuación.
+        """
+        if self._cache is not None:
+            self._cache.invalidar()
+    
+    def estadisticas_cache(self):
+        """
+        Devuelve las estadísticas de la caché de resultados.
+        
+        Returns:
+            dict | None: Estadísticas (ver CacheResultados.estadisticas) o None
+                si la caché está desactivada
+        """
+        if self._cache is None:
+            return None
+        return self._cache.estadisticas()
+    
     def validar(self, contrasena):
         """
         Valida una contraseña contra todos los criterios de seguridad.
@@ -49,146 +128,142 @@ class ValidadorContrasena:
                     'sugerencias': list[str]
                 }
         """
-        # Validar cada criterio
-        criterios = {
-            'longitud': self._validar_longitud(contrasena),
-            'complejidad': self._validar_complejidad(contrasena),
-            'patrones': self._detectar_patrones(contrasena),
-            'comun': self._verificar_contrasena_comun(contrasena),
-            'filtrada': self._verificar_filtrada(contrasena)
-        }
-        
-        # Calcular puntuación total
-        puntuacion = self._calcular_puntuacion(criterios)
+        if self._cache is None:
+            return self._evaluar(contrasena)
         
-        # Determinar nivel de seguridad
-        nivel = self._determinar_nivel(puntuacion, criterios)
+        # Buscar el resultado en la caché usando solo el HMAC de la contraseña
+        clave = self._cache.clave(contrasena)
+        entrada = self._cache.obtener(clave)
         
-        # Generar sugerencias
-        sugerencias = self._generar_sugerencias(criterios)
+        if entrada is None:
+            resultado = self._evaluar(contrasena)
+        else:
+            resultado, hibp_vigente = entrada
+            if hibp_vigente:
+                return self._copiar_resultado(resultado)
+            
+            # Reutilizar los criterios locales y volver a consultar solo HIBP
+            criterios = dict(resultado['criterios'])
+            criterios['filtrada'] = self._verificar_filtrada(contrasena)
+            resultado = self._componer_resultado(criterios, self.politica)
         
-        return {
-            'puntuacion': puntuacion,
-            'nivel': nivel,
-            'criterios': criterios,
-            'sugerencias': sugerencias
-        }
+        self._cache.guardar(clave, resultado)
+        return self._copiar_resultado(resultado)
     
-    def _validar_longitud(self, contrasena):
+    def validar_politicas(self, contrasena, politicas):
         """
-        Valida la longitud de la contraseña.
+        Valida una contraseña contra varias políticas a la vez.
+        
+        La contraseña se analiza (y se consulta HIBP) una sola vez; cada política
+        solo indexa sus tablas sobre ese mismo análisis. No usa la caché de resultados.
         
         Args:
             contrasena (str): La contraseña a validar
+            politicas (iterable[Politica]): Políticas a evaluar
             
         Returns:
-            dict: Información sobre la longitud y puntos asignados
+            dict: Resultado de cada política (misma estructura que validar()),
+                indexado por el nombre de la política
+                
+        Raises:
+            ValueError: Si dos políticas tienen el mismo nombre
         """
-        longitud = len(contrasena)
-        
-        # Asignar puntos según la longitud
-        if longitud < 8:
-            puntos = 0
-            cumple = False
-        elif longitud <= 10:
-            puntos = 10
-            cumple = True
-        elif longitud <= 12:
-            puntos = 15
-            cumple = True
-        elif longitud <= 15:
-            puntos = 20
-            cumple = True
-        else:
-            puntos = 25
-            cumple = True
+        politicas = list(politicas)
+        nombres = [politica.nombre for politica in politicas]
+        duplicados = sorted({nombre for nombre in nombres if nombres.count(nombre) > 1})
+        if duplicados:
+            raise ValueError(f'Nombres de política duplicados: {", ".join(duplicados)}')
         
+        analisis = self._analizar(contrasena)
         return {
-            'valor': longitud,
-            'cumple': cumple,
-            'puntos': puntos
+            politica.nombre: self._componer_resultado(politica.criterios(analisis), politica)
+            for politica in politicas
         }
-
-    def _validar_complejidad(self, contrasena):
+    
+    def _evaluar(self, contrasena):
         """
-        Valida la complejidad de caracteres de la contraseña.
-        Verifica la presencia de mayúsculas, minúsculas, números y caracteres especiales.
+        Evalúa todos los criterios de una contraseña sin usar la caché.
         
         Args:
             contrasena (str): La contraseña a validar
             
         Returns:
-            dict: Información sobre los tipos de caracteres y puntos asignados
+            dict: Resultado con la misma estructura que validar()
         """
-        # Verificar cada tipo de carácter
-        tiene_mayus = utils.tiene_mayusculas(contrasena)
-        tiene_minus = utils.tiene_minusculas(contrasena)
-        tiene_nums = utils.tiene_numeros(contrasena)
-        tiene_especiales = utils.tiene_caracteres_especiales(contrasena)
+        criterios = self.politica.criterios(self._analizar(contrasena))
+        return self._componer_resultado(criterios, self.politica)
+    
+    def _componer_resultado(self, criterios, politica):
+        """
+        Calcula puntuación, nivel y sugerencias a partir de los criterios evaluados.
         
-        # Contar cuántos tipos de caracteres se usan
-        tipos_usados = sum([tiene_mayus, tiene_minus, tiene_nums, tiene_especiales])
+        Args:
+            criterios (dict): Diccionario con todos los criterios evaluados
+            politica (Politica): Política con la que se puntúa
+            
+        Returns:
+            dict: Resultado con la misma estructura que validar()
+        """
+        # Calcular puntuación total
+        puntuacion = politica.calcular_puntuacion(criterios)
         
-        # Asignar puntos según la cantidad de tipos
-        if tipos_usados == 1:
-            puntos = 5
-            cumple = False
-        elif tipos_usados == 2:
-            puntos = 15
-            cumple = False
-        elif tipos_usados == 3:
-            puntos = 25
-            cumple = True
-        else:  # 4 tipos
-            puntos = 30
-            cumple = True
+        # Determinar nivel de seguridad
+        nivel = politica.determinar_nivel(puntuacion, criterios)
+        
+        # Generar sugerencias
+        sugerencias = self._generar_sugerencias(criterios, politica)
         
         return {
-            'mayusculas': tiene_mayus,
-            'minusculas': tiene_minus,
-            'numeros': tiene_nums,
-            'especiales': tiene_especiales,
-            'tipos_usados': tipos_usados,
-            'cumple': cumple,
-            'puntos': puntos
+            'puntuacion': puntuacion,
+            'nivel': nivel,
+            'criterios': criterios,
+            'sugerencias': sugerencias
         }
-
-    def _detectar_patrones(self, contrasena):
+    
+    def _copiar_resultado(self, resultado):
         """
-        Detecta patrones comunes en la contraseña.
-        Busca secuencias numéricas, alfabéticas y repeticiones de caracteres.
+        Copia un resultado memorizado para que el llamador pueda modificarlo
+        sin alterar la caché.
         
         Args:
-            contrasena (str): La contraseña a validar
+            resultado (dict): Resultado guardado en la caché
             
         Returns:
-            dict: Información sobre los patrones detectados y puntos asignados
+            dict: Copia independiente del resultado
         """
-        # Detectar cada tipo de patrón
-        tiene_sec_numerica = utils.detectar_secuencia_numerica(contrasena)
-        tiene_sec_alfabetica = utils.detectar_secuencia_alfabetica(contrasena)
-        tiene_repeticiones = utils.detectar_repeticiones(contrasena)
-        
-        # Contar cuántos patrones se detectaron
-        patrones_detectados = sum([tiene_sec_numerica, tiene_sec_alfabetica, tiene_repeticiones])
-        
-        # Asignar puntos según los patrones detectados
-        if patrones_detectados == 0:
-            puntos = 20
-            cumple = True
-        elif patrones_detectados == 1:
-            puntos = 10
-            cumple = False
-        else:  # 2 o más patrones
-            puntos = 0
-            cumple = False
+        criterios = {
+            nombre: dict(valor) if isinstance(valor, dict) else valor
+            for nombre, valor in resultado['criterios'].items()
+        }
+        return {
+            'puntuacion': resultado['puntuacion'],
+            'nivel': resultado['nivel'],
+            'criterios': criterios,
+            'sugerencias': list(resultado['sugerencias'])
+        }
+    
+    def _analizar(self, contrasena):
+        """
+        Analiza la contraseña una sola vez, independientemente de la política.
+        Detecta los tipos de caracteres, los patrones, si es común y si está filtrada.
         
+        Args:
+            contrasena (str): La contraseña a analizar
+            
+        Returns:
+            dict: Hechos observados sobre la contraseña (sin puntuar)
+        """
         return {
-            'secuencias_numericas': tiene_sec_numerica,
-            'secuencias_alfabeticas': tiene_sec_alfabetica,
-            'repeticiones': tiene_repeticiones,
-            'cumple': cumple,
-            'puntos': puntos
+            'longitud': len(contrasena),
+            'mayusculas': utils.tiene_mayusculas(contrasena),
+            'minusculas': utils.tiene_minusculas(contrasena),
+            'numeros': utils.tiene_numeros(contrasena),
+            'especiales': utils.tiene_caracteres_especiales(contrasena),
+            'secuencias_numericas': utils.detectar_secuencia_numerica(contrasena),
+            'secuencias_alfabeticas': utils.detectar_secuencia_alfabetica(contrasena),
+            'repeticiones': utils.detectar_repeticiones(contrasena),
+            'comun': self._verificar_contrasena_comun(contrasena),
+            'filtrada': self._verificar_filtrada(contrasena)
         }
 
     def _verificar_contrasena_comun(self, contrasena):
@@ -225,77 +300,13 @@ class ValidadorContrasena:
                 'error': f'No se pudo verificar filtraciones: {str(e)}'
             }
 
-    def _calcular_puntuacion(self, criterios):
-        """
-        Calcula la puntuación total de la contraseña.
-        
-        Args:
-            criterios (dict): Diccionario con todos los criterios evaluados
-            
-        Returns:
-            int: Puntuación total (0-100)
-        """
-        puntuacion = 0
-        
-        # Sumar puntos de longitud
-        puntuacion += criterios['longitud']['puntos']
-        
-        # Sumar puntos de complejidad
-        puntuacion += criterios['complejidad']['puntos']
-        
-        # Sumar puntos de patrones
-        puntuacion += criterios['patrones']['puntos']
-        
-        # Sumar puntos si no es contraseña común
-        if not criterios['comun']:
-            puntuacion += 15
-        
-        # Sumar puntos si no está filtrada
-        if not criterios['filtrada']['filtrada']:
-            puntuacion += 10
-        
-        return puntuacion
-    
-    def _determinar_nivel(self, puntuacion, criterios):
-        """
-        Determina el nivel de seguridad basado en la puntuación y criterios especiales.
-        
-        Args:
-            puntuacion (int): Puntuación total
-            criterios (dict): Diccionario con todos los criterios evaluados
-            
-        Returns:
-            str: Nivel de seguridad
-        """
-        # Casos especiales que anulan la puntuación
-        if criterios['filtrada']['filtrada']:
-            veces = criterios['filtrada']['veces_vista']
-            if veces >= 100:
-                return 'Muy Comprometida'
-            else:
-                return 'Comprometida'
-        
-        if criterios['comun']:
-            return 'Muy Débil'
-        
-        # Niveles normales basados en puntuación
-        if puntuacion <= 30:
-            return 'Muy Débil'
-        elif puntuacion <= 50:
-            return 'Débil'
-        elif puntuacion <= 70:
-            return 'Aceptable'
-        elif puntuacion <= 85:
-            return 'Fuerte'
-        else:
-            return 'Muy Fuerte'
-
-    def _generar_sugerencias(self, criterios):
+    def _generar_sugerencias(self, criterios, politica):
         """
         Genera sugerencias específicas para mejorar la contraseña.
         
         Args:
             criterios (dict): Diccionario con todos los criterios evaluados
+            politica (Politica): Política con las longitudes mínima y recomendada
             
         Returns:
             list: Lista de sugerencias en español
@@ -318,10 +329,14 @@ class ValidadorContrasena:
         
         # Sugerencias sobre longitud
         longitud = criterios['longitud']['valor']
-        if longitud < 8:
-            sugerencias.append('❌ Tu contraseña es demasiado corta. Usa al menos 8 caracteres.')
-        elif longitud < 12:
-            sugerencias.append('⚡ Considera usar al menos 12 caracteres para mayor seguridad.')
+        if longitud < politica.longitud_minima:
+            sugerencias.append(
+                f'❌ Tu contraseña es demasiado corta. Usa al menos {politica.longitud_minima} caracteres.'
+            )
+        elif longitud < politica.longitud_recomendada:
+            sugerencias.append(
+                f'⚡ Considera usar al menos {politica.longitud_recomendada} caracteres para mayor seguridad.'
+            )
         
         # Sugerencias sobre complejidad
         comp = criterios['complejidad']